@@ -10,9 +10,12 @@ from pathlib import Path
 # Añadir path de utilidades
 sys.path.append(str(Path(__file__).parent))
 
-from config import DASHBOARD_CONFIG, TEXTS, COLORS, COLOR_JUSTIFICATION
+from config import (DASHBOARD_CONFIG, TEXTS, COLORS, COLOR_JUSTIFICATION, LOADER_CONFIG,
+                    MODEL_CONFIG, PRODUCTOS, TRAINING_CONFIG, ARTIFACT_CONFIG)
+from utils.artifacts import ModelArtifactStore
+from utils.background import BackgroundTrainer
 from utils.data_loader import DataLoader
-from utils.predictive_models import PredictiveModels
+from utils.predictive_models import MODELOS, metrics_table
 from utils.visualization_utils import *
 
 # Configuración de página
@@ -43,36 +46,42 @@ st.markdown(f"""
     </style>
     """, unsafe_allow_html=True)
 
-# Cache de datos
-@st.cache_data
+# Cache de datos (cache_resource: el loader y su cubo de agregaciones se
+# comparten entre reruns en lugar de copiarse en cada uno)
+@st.cache_resource
 def load_all_data():
     """Carga todos los datos necesarios"""
-    loader = DataLoader()
+    loader = DataLoader(**LOADER_CONFIG)
     df_imp, df_cons = loader.load_data()
     return loader, df_imp, df_cons
 
-@st.cache_data
-def train_all_models(df_imp, df_cons):
-    """Entrena todos los modelos para todas las series"""
-    model_trainer = PredictiveModels(test_size=0.2)
-    
-    productos = ['Gasolina regular', 'Gasolina superior', 'Diesel alto azufre']
-    tipos = ['Importación', 'Consumo']
-    
-    resultados = {}
-    
-    for tipo in tipos:
-        df = df_imp if tipo == 'Importación' else df_cons
-        for producto in productos:
-            serie_nombre = f'{tipo} {producto}'
-            with st.spinner(f'Entrenando modelos para {serie_nombre}...'):
-                df_metrics = model_trainer.compare_models(df[producto], serie_nombre)
-                resultados[serie_nombre] = {
-                    'metrics': df_metrics,
-                    'trainer': model_trainer
-                }
-    
-    return resultados
+# Entrenamiento en segundo plano (cache_resource: el pool y los resultados
+# sobreviven a los reruns y se comparten entre sesiones)
+@st.cache_resource
+def get_trainer():
+    """Crea el administrador de entrenamiento en segundo plano"""
+    return BackgroundTrainer(
+        test_size=MODEL_CONFIG['test_size'],
+        random_state=MODEL_CONFIG['random_state'],
+        artifacts=ModelArtifactStore(
+            Path('data') / ARTIFACT_CONFIG['dir'],
+            ARTIFACT_CONFIG['max_bytes']
+        ),
+        parallel=TRAINING_CONFIG['parallel'],
+        max_workers=TRAINING_CONFIG['max_workers']
+    )
+
+@st.fragment(run_every=TRAINING_CONFIG['poll_seconds'])
+def show_training_progress(pendientes):
+    """Muestra el avance del entrenamiento y refresca la vista cuando terminan los pendientes"""
+    trainer = get_trainer()
+    terminados, total = trainer.progress()
+    st.progress(
+        terminados / total if total else 0.0,
+        text=f'Entrenando modelos en segundo plano ({terminados}/{total})...'
+    )
+    if all(trainer.status(*pendiente) != 'pendiente' for pendiente in pendientes):
+        st.rerun()
 
 # Header principal
 st.markdown(f"# {TEXTS['main_title']}")
@@ -104,6 +113,14 @@ with st.sidebar:
 # Cargar datos
 loader, df_imp, df_cons = load_all_data()
 
+# Encolar todos los modelos; los ya entrenados o en curso no se repiten
+trainer = get_trainer()
+trainer.submit_all({
+    f'{tipo} {producto}': (df_imp if tipo == 'Importación' else df_cons)[producto]
+    for tipo in ['Importación', 'Consumo']
+    for producto in PRODUCTOS
+})
+
 # ============================================================================
 # VISTA 1: EXPLORACIÓN DE DATOS
 # ============================================================================
@@ -133,7 +150,7 @@ if vista == " Exploración de Datos":
         with col2:
             producto_sel = st.selectbox(
                 "Producto:",
-                ["Gasolina regular", "Gasolina superior", "Diesel alto azufre"]
+                PRODUCTOS
             )
         
         # Gráfico según selección
@@ -249,7 +266,7 @@ if vista == " Exploración de Datos":
         with col2:
             producto_dist = st.selectbox(
                 "Producto:",
-                ["Gasolina regular", "Gasolina superior", "Diesel alto azufre"],
+                PRODUCTOS,
                 key="prod_dist"
             )
         
@@ -282,6 +299,7 @@ elif vista == " Modelos Predictivos":
     - **Linear Regression**: Modelo de regresión lineal simple
     - **Random Forest**: Modelo de ensamble basado en árboles de decisión
     - **SARIMA**: Modelo estadístico para series de tiempo con estacionalidad
+    - **Seasonal Naive, Drift y Holt-Winters**: Modelos de referencia de cálculo inmediato
     """)
     
     # Selección de serie y modelo
@@ -293,29 +311,38 @@ elif vista == " Modelos Predictivos":
     with col2:
         producto_pred = st.selectbox(
             "Producto:",
-            ["Gasolina regular", "Gasolina superior", "Diesel alto azufre"],
+            PRODUCTOS,
             key="prod_pred"
         )
     
     with col3:
         modelo_pred = st.selectbox(
             "Modelo:",
-            ["Linear Regression", "Random Forest", "SARIMA"]
+            list(MODELOS)
         )
     
     serie_nombre = f'{tipo_pred} {producto_pred}'
+    serie_pred = (df_imp if tipo_pred == 'Importación' else df_cons)[producto_pred]
     
-    # Entrenar modelos (con cache)
-    with st.spinner(' Entrenando modelos...'):
-        resultados = train_all_models(df_imp, df_cons)
+    # Priorizar el modelo seleccionado sin bloquear la vista
+    trainer.submit(serie_nombre, serie_pred, modelo_pred, prioridad=True)
+    resultado = trainer.get(serie_nombre, modelo_pred)
+    
+    if trainer.status(serie_nombre, modelo_pred) == 'fallido':
+        error = trainer.error(serie_nombre, modelo_pred)
+        st.error(
+            f"No se pudo entrenar {modelo_pred} para {serie_nombre}"
+            + (f": {error}" if error else "")
+        )
+    elif resultado is None:
+        show_training_progress([(serie_nombre, modelo_pred)])
     
     # Obtener resultados
-    if serie_nombre in resultados:
-        trainer = resultados[serie_nombre]['trainer']
-        df_metrics = resultados[serie_nombre]['metrics']
+    if resultado is not None:
+        df_metrics = metrics_table({modelo_pred: resultado.metrics})
         
         # Obtener predicciones
-        predictions = trainer.get_predictions(serie_nombre, modelo_pred)
+        predictions = resultado.predictions
         
         # Mostrar métricas
         st.markdown(f"###  Métricas del Modelo: {modelo_pred}")
@@ -398,19 +425,36 @@ else:  # Comparación de Modelos
     with col2:
         producto_comp = st.selectbox(
             "Producto:",
-            ["Gasolina regular", "Gasolina superior", "Diesel alto azufre"],
+            PRODUCTOS,
             key="prod_comp"
         )
     
     serie_comp = f'{tipo_comp} {producto_comp}'
     
-    # Entrenar modelos
-    with st.spinner(' Entrenando y comparando modelos...'):
-        resultados = train_all_models(df_imp, df_cons)
+    # Priorizar los modelos de la serie seleccionada; la tabla se completa
+    # a medida que llegan los resultados
+    serie = (df_imp if tipo_comp == 'Importación' else df_cons)[producto_comp]
+    for modelo in MODELOS:
+        trainer.submit(serie_comp, serie, modelo, prioridad=True)
+    modelos = {modelo: trainer.get(serie_comp, modelo) for modelo in MODELOS}
+    df_metrics = metrics_table({
+        modelo: resultado.metrics if resultado is not None else None
+        for modelo, resultado in modelos.items()
+    })
     
-    if serie_comp in resultados:
-        df_metrics = resultados[serie_comp]['metrics']
-        trainer = resultados[serie_comp]['trainer']
+    pendientes = [
+        (serie_comp, modelo) for modelo in MODELOS
+        if trainer.status(serie_comp, modelo) == 'pendiente'
+    ]
+    if pendientes:
+        show_training_progress(pendientes)
+        
+    for modelo in MODELOS:
+        if trainer.status(serie_comp, modelo) == 'fallido':
+            error = trainer.error(serie_comp, modelo)
+            st.warning(f"No se pudo entrenar {modelo}" + (f": {error}" if error else ""))
+            
+    if not df_metrics.empty:
         
         # Tabla comparativa
         st.markdown("###  Tabla Comparativa de Modelos")
@@ -481,7 +525,7 @@ else:  # Comparación de Modelos
                 modelos_seleccionados
             )
             
-            predictions_viz = trainer.get_predictions(serie_comp, modelo_viz)
+            predictions_viz = modelos[modelo_viz].predictions if modelos.get(modelo_viz) else None
             if predictions_viz:
                 fig_viz = create_prediction_plot(predictions_viz, serie_comp, modelo_viz)
                 st.plotly_chart(fig_viz, use_container_width=True)
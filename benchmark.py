@@ -0,0 +1,309 @@
+"""
+Benchmarks de rendimiento del dashboard
+Uso: python benchmark.py
+"""
+import os
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from config import MODEL_CONFIG, SARIMA_SEARCH_CONFIG
+from utils.batch_models import ForestBatch, linear_regression_batch
+from utils import order_search
+from utils.backtest import backtest
+from utils.data_loader import DataLoader
+from utils.features import lag_matrix
+from utils.predictive_models import MODELOS, PredictiveModels
+
+def best_time(func, repeticiones=3):
+    """Retorna el mejor tiempo (segundos) y el resultado de la última ejecución"""
+    mejor = float('inf')
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+def _prepare_data_loop(serie, lookback=12, test_size=0.2):
+    """Versión anterior de prepare_data (una fila por iteración), como referencia"""
+    serie = serie.dropna()
+    X, y = [], []
+    for i in range(lookback, len(serie)):
+        X.append(serie.iloc[i-lookback:i].values)
+        y.append(serie.iloc[i])
+    X = np.array(X)
+    y = np.array(y)
+    split_idx = int(len(X) * (1 - test_size))
+    return X[:split_idx], X[split_idx:], y[:split_idx], y[split_idx:], serie.index[lookback:]
+
+def bench_prepare_data(n_meses=20000, lookback=12, repeticiones=3):
+    """Compara la matriz de rezagos con bucle contra la versión vectorizada"""
+    print("=== Matriz de rezagos: bucle vs sliding window ===")
+    
+    rng = np.random.default_rng(42)
+    serie = pd.Series(
+        rng.normal(size=n_meses).cumsum(),
+        index=pd.date_range('1900-01-01', periods=n_meses, freq='MS')
+    )
+    
+    t_bucle, _ = best_time(lambda: _prepare_data_loop(serie, lookback), repeticiones)
+    t_vector, _ = best_time(
+        lambda: PredictiveModels().prepare_data(serie, lookback), repeticiones
+    )
+    
+    # Misma instancia: la segunda llamada (otro modelo) reutiliza las matrices
+    modelos = PredictiveModels()
+    modelos.prepare_data(serie, lookback)
+    t_memo, _ = best_time(lambda: modelos.prepare_data(serie, lookback), repeticiones)
+    
+    print(f"Serie sintética: {n_meses} meses, lookback {lookback}")
+    print(f"Bucle:       {t_bucle:.4f} s")
+    print(f"Vectorizado: {t_vector:.4f} s ({t_bucle / t_vector:.0f}x)")
+    print(f"Memoizado:   {t_memo:.4f} s")
+
+def bench_linear_batch(n_series=300, n_meses=300, repeticiones=3):
+    """Compara una LinearRegression por serie contra el ajuste por lotes"""
+    print("=== Regresión lineal: una por serie vs por lotes ===")
+    
+    rng = np.random.default_rng(42)
+    fechas = pd.date_range('2000-01-01', periods=n_meses, freq='MS')
+    series = {
+        f'serie_{i}': pd.Series(rng.normal(size=n_meses).cumsum() + 100, index=fechas)
+        for i in range(n_series)
+    }
+    
+    t_bucle, _ = best_time(
+        lambda: {
+            nombre: PredictiveModels().train_linear_regression(serie)
+            for nombre, serie in series.items()
+        },
+        repeticiones
+    )
+    t_lote, _ = best_time(lambda: linear_regression_batch(series), repeticiones)
+        
+    print(f"Series sintéticas: {n_series} x {n_meses} meses")
+    print(f"Una por serie: {t_bucle:.3f} s")
+    print(f"Por lotes:     {t_lote:.3f} s ({t_bucle / t_lote:.0f}x)")
+
+def bench_sarima_update(meses_nuevos=3, repeticiones=3):
+    """Compara reestimar SARIMA contra actualizarlo con los meses nuevos"""
+    print("=== SARIMA con un mes nuevo: reestimar vs actualizar ===")
+    
+    _, df_consumo = DataLoader().load_data()
+    serie = df_consumo['Gasolina regular'].dropna()
+    modelos = PredictiveModels()
+    previo = modelos.train_sarima(serie.iloc[:-meses_nuevos])
+    
+    t_refit, completo = best_time(lambda: modelos.train_sarima(serie), repeticiones)
+    t_update, actualizado = best_time(lambda: modelos.update_sarima(previo, serie), repeticiones)
+    
+    print(f"Meses nuevos: {meses_nuevos}")
+    print(f"Reestimar:  {t_refit:.3f} s (MAE test {completo['metrics']['test']['mae']:,.0f})")
+    print(f"Actualizar: {t_update:.3f} s (MAE test {actualizado['metrics']['test']['mae']:,.0f}, "
+          f"{actualizado['sin_reajuste']} meses sin reajuste)")
+
+def bench_sarima_search():
+    """Compara la búsqueda de órdenes SARIMA con poda, sin poda y memoizada"""
+    print("=== Búsqueda de órdenes SARIMA ===")
+    
+    _, df_consumo = DataLoader().load_data()
+    modelos = PredictiveModels()
+    serie = df_consumo['Gasolina regular'].dropna()
+    train = pd.Series(
+        modelos.scaler.fit_transform(serie.values.reshape(-1, 1)).flatten() * 10, index=serie.index
+    ).iloc[:int(len(serie) * (1 - modelos.test_size))]
+    
+    # Sin poda: el ajuste preliminar ya es el completo y todos llegan a la final
+    busqueda = modelos.order_search
+    exhaustiva = order_search.SarimaOrderSearch(
+        **SARIMA_SEARCH_CONFIG['grid'],
+        criterio=busqueda.criterio,
+        maxiter=busqueda.maxiter,
+        maxiter_poda=busqueda.maxiter,
+        margen_poda=float('inf'),
+        finalistas=len(busqueda.candidatos),
+        parallel=busqueda.parallel
+    )
+    
+    order_search._MEMO.clear()
+    t_exhaustiva, sin_poda = best_time(lambda: exhaustiva.select(train), 1)
+    order_search._MEMO.clear()
+    t_poda, con_poda = best_time(lambda: busqueda.select(train), 1)
+    t_memo, _ = best_time(lambda: busqueda.select(train))
+    
+    print(f"Candidatos: {len(busqueda.candidatos)}")
+    print(f"Sin poda:   {t_exhaustiva:.2f} s -> {sin_poda}")
+    print(f"Con poda:   {t_poda:.2f} s -> {con_poda}")
+    print(f"Memoizada:  {t_memo * 1000:.2f} ms")
+
+def bench_random_forest(repeticiones=3):
+    """Compara el bosque fijo de 100 árboles en un núcleo con el crecimiento por OOB"""
+    print("=== Random Forest: 100 árboles vs crecimiento con parada por OOB ===")
+    
+    df_importacion, df_consumo = DataLoader().load_data()
+    modelos = PredictiveModels()
+    series = [df[col] for df in (df_importacion, df_consumo) for col in df.columns]
+    
+    def fijo():
+        for serie in series:
+            X_train, _, y_train, _, _ = modelos.prepare_data(serie)
+            RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42).fit(X_train, y_train)
+            
+    t_fijo, _ = best_time(fijo, repeticiones)
+    t_oob, bosques = best_time(lambda: [modelos.train_random_forest(serie) for serie in series], repeticiones)
+    
+    print(f"Series: {len(series)}, núcleos: {os.cpu_count()}")
+    print(f"100 árboles, 1 núcleo:  {t_fijo:.3f} s")
+    print(f"Parada por OOB:         {t_oob:.3f} s "
+          f"(árboles: {[resultado['model'].n_estimators for resultado in bosques]})")
+
+def bench_global_model(n_series=(6, 30, 120), n_meses=240):
+    """Compara un Random Forest por serie contra un único modelo global"""
+    print("=== Random Forest: uno por serie vs modelo global ===")
+    
+    rng = np.random.default_rng(42)
+    fechas = pd.date_range('2000-01-01', periods=n_meses, freq='MS')
+    modelos = PredictiveModels()
+    for n in n_series:
+        series = {
+            f'serie_{i}': pd.Series(rng.normal(size=n_meses).cumsum() + 100, index=fechas)
+            for i in range(n)
+        }
+        t_local, locales = best_time(
+            lambda: {nombre: modelos.train_random_forest(serie) for nombre, serie in series.items()}, 1
+        )
+        t_global, globales = best_time(lambda: modelos.train_global(series, 'Random Forest'), 1)
+        
+        mae_local = np.mean([resultado['metrics']['test']['mae'] for resultado in locales.values()])
+        mae_global = np.mean([resultado['metrics']['test']['mae'] for resultado in globales.values()])
+        print(f"{n:>4} series: uno por serie {t_local:.2f} s (MAE {mae_local:.2f}), "
+              f"global {t_global:.2f} s (MAE {mae_global:.2f})")
+
+def bench_backtest():
+    """Mide el backtest con origen móvil de los modelos por defecto sobre una serie"""
+    print("=== Backtest con origen móvil ===")
+    
+    _, df_consumo = DataLoader().load_data()
+    serie = df_consumo['Gasolina regular']
+    
+    t_serie, (por_fold, agregado) = best_time(lambda: backtest(serie, parallel=False), 1)
+    t_pool, _ = best_time(lambda: backtest(serie, parallel=True), 1)
+    
+    print(f"Folds: {por_fold['Fold'].nunique()}, núcleos: {os.cpu_count()}")
+    print(f"En serie: {t_serie:.2f} s")
+    print(f"En pool:  {t_pool:.2f} s")
+    print(agregado[['Modelo', 'MAE (Test)', 'R² (Test)']].to_string(index=False))
+
+def bench_forecast(n_series=300, n_meses=240, horizonte=24):
+    """Compara el pronóstico recursivo con predict por serie y paso contra el lote en NumPy"""
+    print("=== Pronóstico recursivo de regresión lineal: predict por paso vs lote ===")
+    
+    rng = np.random.default_rng(42)
+    fechas = pd.date_range('2000-01-01', periods=n_meses, freq='MS')
+    series = {
+        f'serie_{i}': pd.Series(rng.normal(size=n_meses).cumsum() + 100, index=fechas)
+        for i in range(n_series)
+    }
+    # Mismo ajuste que forecast: todas las ventanas de cada serie
+    modelos = {
+        nombre: LinearRegression().fit(*lag_matrix(serie.to_numpy(), 12))
+        for nombre, serie in series.items()
+    }
+    
+    def por_paso():
+        pronosticos = {}
+        for nombre, serie in series.items():
+            modelo = modelos[nombre]
+            ventana = list(serie.to_numpy()[-12:])
+            for _ in range(horizonte):
+                ventana.append(modelo.predict(np.array(ventana[-12:])[None, :])[0])
+            pronosticos[nombre] = ventana[12:]
+        return pronosticos
+        
+    t_bucle, _ = best_time(por_paso, 1)
+    t_lote, _ = best_time(
+        lambda: PredictiveModels().forecast(series, 'Linear Regression', horizonte), 1
+    )
+        
+    print(f"Series sintéticas: {n_series}, horizonte: {horizonte} meses")
+    print(f"predict por serie y paso: {t_bucle:.3f} s")
+    print(f"Lote (incluye el ajuste): {t_lote:.3f} s ({t_bucle / t_lote:.0f}x)")
+
+def bench_forecast_forest(n_series=60, n_meses=240, horizonte=24):
+    """Compara la recursión de Random Forest con predict por serie y paso contra ForestBatch"""
+    print("=== Pronóstico recursivo de Random Forest: predict por paso vs árboles aplanados ===")
+    
+    rng = np.random.default_rng(42)
+    fechas = pd.date_range('2000-01-01', periods=n_meses, freq='MS')
+    series = [rng.normal(size=n_meses).cumsum() + 100 for _ in range(n_series)]
+    modelos = PredictiveModels()
+    bosques = [
+        modelos.train_random_forest(pd.Series(valores, index=fechas))['model'] for valores in series
+    ]
+    for bosque in bosques:
+        bosque.set_params(n_jobs=1)
+    inicial = np.stack([valores[-12:] for valores in series])
+    
+    def por_paso():
+        ventanas = inicial.copy()
+        pronostico = np.empty((n_series, horizonte))
+        for h in range(horizonte):
+            pronostico[:, h] = [bosque.predict(ventanas[b:b + 1])[0] for b, bosque in enumerate(bosques)]
+            ventanas = np.concatenate([ventanas[:, 1:], pronostico[:, h:h + 1]], axis=1)
+        return pronostico
+        
+    def aplanado():
+        lote = ForestBatch(bosques)
+        ventanas = inicial.copy()
+        pronostico = np.empty((n_series, horizonte))
+        for h in range(horizonte):
+            pronostico[:, h] = lote.predict(ventanas)
+            ventanas = np.concatenate([ventanas[:, 1:], pronostico[:, h:h + 1]], axis=1)
+        return pronostico
+        
+    t_bucle, _ = best_time(por_paso, 1)
+    t_lote, _ = best_time(aplanado, 1)
+    
+    print(f"Series sintéticas: {n_series}, horizonte: {horizonte} meses, "
+          f"árboles: {sum(len(bosque.estimators_) for bosque in bosques)}")
+    print(f"predict por serie y paso:      {t_bucle:.3f} s")
+    print(f"ForestBatch (incluye aplanar): {t_lote:.3f} s ({t_bucle / t_lote:.0f}x)")
+
+def bench_intervals():
+    """Mide la cobertura de las bandas de predicción en la prueba de cada modelo"""
+    print("=== Bandas de predicción: cobertura en la prueba ===")
+    
+    df_importacion, df_consumo = DataLoader().load_data()
+    series = [df[col] for df in (df_importacion, df_consumo) for col in df.columns]
+    modelos = PredictiveModels()
+    
+    inicio = time.perf_counter()
+    coberturas = {}
+    for serie in series:
+        for model_name in MODELOS:
+            resultado = modelos.train_model(serie, model_name)
+            if resultado is None:
+                continue
+            p = resultado['predictions']
+            dentro = (p['y_test'] >= p['lower_test']) & (p['y_test'] <= p['upper_test'])
+            coberturas.setdefault(model_name, []).append(dentro.mean())
+    total = time.perf_counter() - inicio
+    
+    print(f"Nivel nominal: {1 - MODEL_CONFIG['interval_alpha']:.0%} ({len(series)} series, "
+          f"{total:.1f} s entrenando, sin ajustes extra para los intervalos)")
+    for model_name, valores in coberturas.items():
+        print(f"{model_name:<18} {np.mean(valores):.0%}")
+
+if __name__ == '__main__':
+    bench_prepare_data()
+    bench_linear_batch()
+    bench_sarima_update()
+    bench_sarima_search()
+    bench_random_forest()
+    bench_global_model()
+    bench_backtest()
+    bench_forecast()
+    bench_forecast_forest()
+    bench_intervals()
@@ -39,6 +39,76 @@ MODEL_CONFIG = {
     'random_state': 42,
     'sarima_order': (1, 1, 1),
     'sarima_seasonal_order': (1, 1, 1, 12),
+    'sarima_refit_every': 12,            # Meses agregados antes de reestimar SARIMA
+    'sarima_drift_threshold': 3.0,       # Error nuevo / error histórico que fuerza reestimar
+    'rf_n_jobs': -1,                     # Núcleos para Random Forest (-1: todos)
+    'rf_refit_every': 12,                # Meses agregados antes de reentrenar Random Forest
+    'interval_alpha': 0.1,               # Bandas empíricas de residuos, nivel nominal 90%
+}
+
+# BÚSQUEDA AUTOMÁTICA DE ÓRDENES SARIMA
+SARIMA_SEARCH_CONFIG = {
+    'enabled': True,                     # False: usar los órdenes de MODEL_CONFIG
+    'grid': {
+        'p': (0, 1, 2), 'd': (1,), 'q': (0, 1, 2),
+        'P': (0, 1), 'D': (1,), 'Q': (0, 1),
+        'periodo': 12,
+    },
+    'criterio': 'aic',                   # 'aic' o 'bic'
+    'maxiter_poda': 5,                   # Iteraciones del ajuste preliminar
+    'margen_poda': 10.0,                 # Descartar si el criterio supera al mejor por este margen
+    'finalistas': 4,                     # Candidatos que llegan al ajuste completo
+    'parallel': True,                    # Candidatos en un pool de procesos
+    'max_workers': None,
+}
+
+# BACKTEST CON ORIGEN MÓVIL (ventana expansiva)
+BACKTEST_CONFIG = {
+    'horizonte': 12,                     # Meses de prueba de cada fold
+    'paso': 12,                          # Meses entre orígenes consecutivos
+    'min_train': 60,                     # Meses de entrenamiento del primer fold
+    'parallel': True,                    # Folds en un pool de procesos
+    'max_workers': None,
+}
+
+# ENTRENAMIENTO DE MODELOS
+TRAINING_CONFIG = {
+    'parallel': True,                    # Cada (serie, modelo) en un pool de procesos
+    'max_workers': None,                 # Por defecto, uno por CPU
+    'poll_seconds': 2,                   # Refresco de la vista mientras se entrena
+}
+
+# ALMACÉN DE MODELOS ENTRENADOS
+ARTIFACT_CONFIG = {
+    'dir': '.models',                    # Relativo a la carpeta de datos
+    'max_bytes': 256 * 2**20,            # Desalojo LRU por encima de este tamaño
+}
+
+# CARGA DE DATOS
+LOADER_CONFIG = {
+    'engine': 'pandas',                  # 'pandas' o 'streaming'
+    'all_products': False,               # Todos los productos en float32
+    'backend': None,                     # None (en memoria) o 'sqlite'
+}
+
+# CACHÉ DE DATOS PREPROCESADOS
+CACHE_CONFIG = {
+    'dir': '.cache',                     # Relativo a la carpeta de datos
+    'nombre': 'comercializacion',
+}
+
+# INGESTA INCREMENTAL DE PUBLICACIONES MENSUALES
+INGESTION_CONFIG = {
+    'dir': '.store',                     # Relativo a la carpeta de datos
+    'patron': 'IMPORTACION-HIDROCARBUROS-VOLUMEN-*.xlsx',
+    'hoja': 'IMPORTACION',
+    'nombre': 'mensual_importacion',
+    'alias': {'Bunker C o Fuel Oil': 'Bunker'},   # Encabezados renombrados
+}
+
+# BACKEND DE ALMACENAMIENTO EMBEBIDO
+STORAGE_CONFIG = {
+    'sqlite_path': '.store/series.db',   # Relativo a la carpeta de datos
 }
 
 # COLUMNAS DE INTERÉS
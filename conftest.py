@@ -0,0 +1,7 @@
+"""
+Configuración de pytest: permite importar los módulos del proyecto desde tests/
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
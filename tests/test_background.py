@@ -0,0 +1,93 @@
+"""
+Pruebas del entrenamiento en segundo plano
+"""
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from utils import background
+from utils.background import BackgroundTrainer
+from utils.training import MODELOS_LOTE
+
+def _serie(n=96, semilla=0):
+    rng = np.random.default_rng(semilla)
+    valores = 100 + rng.normal(size=n).cumsum()
+    return pd.Series(valores, index=pd.date_range('2010-01-01', periods=n, freq='MS'))
+
+def _esperar(trainer, nombre, model_name, limite=30.0):
+    """Espera a que un trabajo deje de estar pendiente"""
+    fin = time.monotonic() + limite
+    while trainer.status(nombre, model_name) == 'pendiente':
+        assert time.monotonic() < fin, "El trabajo no terminó a tiempo"
+        time.sleep(0.01)
+    return trainer.status(nombre, model_name)
+
+@pytest.fixture
+def trainer():
+    trainer = BackgroundTrainer(parallel=False)
+    yield trainer
+    trainer.shutdown()
+
+def test_submit_publishes_result(trainer):
+    assert trainer.status('a', 'Random Forest') is None
+    trainer.submit('a', _serie(), 'Random Forest')
+    
+    assert _esperar(trainer, 'a', 'Random Forest') == 'listo'
+    resultado = trainer.get('a', 'Random Forest')
+    assert resultado.metrics['test']['mae'] > 0
+    assert trainer.error('a', 'Random Forest') is None
+    assert trainer.progress() == (1, 1)
+
+def test_failure_keeps_the_error(trainer, monkeypatch):
+    def fallar(*args):
+        raise ValueError("sin datos")
+        
+    monkeypatch.setattr(background, 'train_one', fallar)
+    trainer.submit('a', _serie(), 'SARIMA')
+    
+    assert _esperar(trainer, 'a', 'SARIMA') == 'fallido'
+    assert trainer.get('a', 'SARIMA') is None
+    assert trainer.error('a', 'SARIMA') == "ValueError: sin datos"
+
+def test_priority_jobs_go_first(trainer, monkeypatch):
+    liberar = threading.Event()
+    orden = []
+    
+    def entrenar(serie, model_name, test_size, random_state, artifacts, nombre):
+        liberar.wait(10)
+        orden.append(nombre)
+        return None
+        
+    monkeypatch.setattr(background, 'train_one', entrenar)
+    # El primero ocupa el único trabajador; los demás esperan en la cola
+    for nombre in ('a', 'b', 'c'):
+        trainer.submit(nombre, _serie(), 'SARIMA')
+    trainer.submit('d', _serie(), 'SARIMA', prioridad=True)
+    liberar.set()
+    
+    for nombre in ('a', 'b', 'c', 'd'):
+        _esperar(trainer, nombre, 'SARIMA')
+    assert orden == ['a', 'd', 'b', 'c']
+
+def test_new_data_replaces_the_job(trainer):
+    serie = _serie()
+    trainer.submit('a', serie.iloc[:-1], 'Random Forest')
+    _esperar(trainer, 'a', 'Random Forest')
+    anterior = trainer.get('a', 'Random Forest')
+    
+    # Con un mes más, el estado y el resultado corresponden a la serie nueva
+    trainer.submit('a', serie, 'Random Forest')
+    assert _esperar(trainer, 'a', 'Random Forest') == 'listo'
+    assert trainer.get('a', 'Random Forest') is not anterior
+    assert trainer.progress() == (1, 1)
+
+def test_submit_all_fits_batched_models_at_once(trainer, monkeypatch):
+    # Solo los modelos por lotes: los demás no llegan a ejecutarse
+    monkeypatch.setattr(background, 'train_one', lambda *args: None)
+    series = {'a': _serie(semilla=1), 'b': _serie(semilla=2)}
+    trainer.submit_all(series)
+    
+    for nombre in series:
+        for model_name in MODELOS_LOTE:
+            assert trainer.status(nombre, model_name) == 'listo'
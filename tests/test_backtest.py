@@ -0,0 +1,62 @@
+"""
+Pruebas del backtest con origen móvil
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from utils.backtest import MODELOS_BACKTEST, backtest, rolling_origins
+from utils.features import lag_matrix
+from utils.predictive_models import PredictiveModels, split_metrics
+
+def _serie(n=120, semilla=1):
+    rng = np.random.default_rng(semilla)
+    t = np.arange(n)
+    valores = 500 + 2 * t + 40 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 5, n)
+    return pd.Series(valores, index=pd.date_range('2010-01-01', periods=n, freq='MS'))
+
+def test_rolling_origins():
+    assert rolling_origins(100, 12, 12, 60) == [60, 72, 84]
+    assert rolling_origins(71, 12, 12, 60) == []
+
+def test_default_models_leave_out_sarima():
+    assert 'SARIMA' not in MODELOS_BACKTEST
+    por_fold, agregado = backtest(_serie(), parallel=False)
+    
+    assert agregado['Modelo'].tolist() == MODELOS_BACKTEST
+    assert len(por_fold) == len(MODELOS_BACKTEST) * len(rolling_origins(120, 12, 12, 60))
+
+def test_fold_metrics_match_direct_fit():
+    serie = _serie()
+    por_fold, _ = backtest(serie, ['Linear Regression', 'Drift'], parallel=False)
+    
+    for fold, origen in enumerate(rolling_origins(len(serie), 12, 12, 60)):
+        filas = por_fold[por_fold['Fold'] == fold + 1].set_index('Modelo')
+        assert filas['Origen'].iloc[0] == serie.index[origen]
+        
+        # Regresión Lineal: ventanas con objetivo antes del origen
+        X, y = lag_matrix(serie.to_numpy(), 12)
+        corte = origen - 12
+        modelo = LinearRegression().fit(X[:corte], y[:corte])
+        esperado = split_metrics(
+            y[:corte], modelo.predict(X[:corte]),
+            y[corte:corte + 12], modelo.predict(X[corte:corte + 12])
+        )
+        assert filas.loc['Linear Regression', 'MAE (Test)'] == pytest.approx(esperado['test']['mae'])
+        
+        # Modelo de referencia: entrenado sobre la serie recortada al final del fold
+        drift = PredictiveModels().train_baseline(serie.iloc[:origen + 12], 'Drift', split_idx=origen)
+        assert filas.loc['Drift', 'MAE (Test)'] == pytest.approx(drift['metrics']['test']['mae'])
+
+def test_pool_matches_serial():
+    serie = _serie(n=96)
+    modelos = ['Linear Regression', 'Seasonal Naive']
+    serial = backtest(serie, modelos, parallel=False)
+    pool = backtest(serie, modelos, parallel=True, max_workers=2)
+    
+    for a, b in zip(serial, pool):
+        pd.testing.assert_frame_equal(a, b)
+
+def test_short_series_raises():
+    with pytest.raises(ValueError):
+        backtest(_serie(n=60), parallel=False)
@@ -0,0 +1,116 @@
+"""
+Pruebas de los modelos vectorizados frente a su versión por serie
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from utils.batch_models import (BASELINES, ForestBatch, LagBatch, SeriesBatch, baselines_batch,
+                                fit_linear_batch, linear_regression_batch)
+from utils.features import lag_matrix
+from utils.predictive_models import PredictiveModels
+
+def _series(n_series=8, n_meses=150, semilla=42):
+    """Caminatas aleatorias mensuales de distinto largo"""
+    rng = np.random.default_rng(semilla)
+    series = {}
+    for i in range(n_series):
+        n = n_meses - 7 * i
+        fechas = pd.date_range('2000-01-01', periods=n, freq='MS')
+        series[f'serie_{i}'] = pd.Series(rng.normal(size=n).cumsum() + 100, index=fechas)
+    return series
+
+def test_fit_linear_batch_matches_sklearn():
+    series = _series()
+    lote = LagBatch(series, lookback=12)
+    coef, intercepto = fit_linear_batch(lote.X, lote.y, lote.train_mask)
+    
+    for b, nombre in enumerate(lote.nombres):
+        t = lote.n_train[b]
+        esperado = LinearRegression().fit(lote.X[b, :t], lote.y[b, :t])
+        np.testing.assert_allclose(coef[b], esperado.coef_, rtol=1e-6, atol=1e-9)
+        assert intercepto[b] == pytest.approx(esperado.intercept_, rel=1e-6)
+
+def test_linear_regression_batch_matches_per_series():
+    series = _series()
+    obtenido = linear_regression_batch(series)
+    
+    for nombre, serie in series.items():
+        esperado = PredictiveModels().train_linear_regression(serie)
+        for clave in ('train', 'test', 'y_train', 'y_test'):
+            np.testing.assert_allclose(
+                obtenido[nombre]['predictions'][clave], esperado['predictions'][clave], rtol=1e-6
+            )
+        assert obtenido[nombre]['metrics']['test']['mae'] == pytest.approx(
+            esperado['metrics']['test']['mae'], rel=1e-6
+        )
+
+def test_forest_batch_matches_sklearn():
+    rng = np.random.default_rng(0)
+    bosques, filas = [], []
+    # Profundidades distintas: los árboles menos profundos quedan en su hoja
+    for profundidad in (2, 5, None):
+        X = rng.normal(size=(120, 6))
+        y = X[:, 0] * 3 + np.sin(X[:, 1]) + rng.normal(scale=0.1, size=120)
+        bosques.append(RandomForestRegressor(
+            n_estimators=15, max_depth=profundidad, random_state=0
+        ).fit(X, y))
+        filas.append(rng.normal(size=6))
+    filas = np.stack(filas)
+    
+    obtenido = ForestBatch(bosques).predict(filas)
+    esperado = [bosque.predict(fila[None, :])[0] for bosque, fila in zip(bosques, filas)]
+    np.testing.assert_allclose(obtenido, esperado, rtol=1e-9)
+
+def test_forecast_matches_step_by_step_predict():
+    series = _series(n_series=4)
+    horizonte = 18
+    obtenido = PredictiveModels().forecast(series, 'Linear Regression', horizonte)
+    
+    for nombre, serie in series.items():
+        # Mismo ajuste que el pronóstico: todas las ventanas de la serie
+        modelo = LinearRegression().fit(*lag_matrix(serie.to_numpy(), 12))
+        ventana = list(serie.to_numpy()[-12:])
+        for _ in range(horizonte):
+            ventana.append(modelo.predict(np.array(ventana[-12:])[None, :])[0])
+        np.testing.assert_allclose(obtenido[nombre].to_numpy(), ventana[12:], rtol=1e-6)
+
+def test_baselines_batch_does_not_depend_on_other_series():
+    series = _series()
+    lote = baselines_batch(series)
+    
+    for nombre, serie in series.items():
+        solo = baselines_batch({nombre: serie})[nombre]
+        for model_name in BASELINES:
+            for clave in ('train', 'test', 'lower_test', 'upper_test'):
+                np.testing.assert_allclose(
+                    lote[nombre][model_name]['predictions'][clave],
+                    solo[model_name]['predictions'][clave],
+                    rtol=1e-12
+                )
+
+def test_seasonal_naive_and_drift_forecasts():
+    serie = _series(n_series=1)['serie_0']
+    valores = serie.to_numpy()
+    resultado = baselines_batch({'serie': serie})['serie']
+    t = SeriesBatch({'serie': serie}).n_train[0]
+    h = np.arange(1, len(valores) - t + 1)
+    
+    # Mismo mes del último año observado
+    np.testing.assert_allclose(
+        resultado['Seasonal Naive']['predictions']['test'], valores[t - 12 + (h - 1) % 12]
+    )
+    # Último valor más la pendiente promedio del entrenamiento
+    pendiente = (valores[t - 1] - valores[0]) / (t - 1)
+    np.testing.assert_allclose(
+        resultado['Drift']['predictions']['test'], valores[t - 1] + h * pendiente
+    )
+
+def test_baselines_split_idx_overrides_test_size():
+    serie = _series(n_series=1)['serie_0']
+    resultado = baselines_batch({'serie': serie}, split_idx=100)['serie']
+    
+    for model_name in BASELINES:
+        assert len(resultado[model_name]['predictions']['y_train']) == 100
+        assert len(resultado[model_name]['predictions']['test']) == len(serie) - 100
@@ -0,0 +1,68 @@
+"""
+Pruebas de la invalidación de la caché en disco
+"""
+import os
+import numpy as np
+import pandas as pd
+from utils.cache import DataCache
+
+def _frames():
+    fechas = pd.date_range('2020-01-01', periods=4, freq='MS', name='Fecha')
+    return {
+        'importacion': pd.DataFrame(
+            {'Diesel': np.arange(4, dtype=np.float32)}, index=fechas
+        )
+    }
+
+def _fuente(tmp_path, contenido=b'abcd'):
+    archivo = tmp_path / 'fuente.xlsx'
+    archivo.write_bytes(contenido)
+    return archivo
+
+def _tocar(archivo, contenido):
+    """Reescribe el archivo y adelanta su mtime"""
+    mtime = archivo.stat().st_mtime_ns
+    archivo.write_bytes(contenido)
+    os.utime(archivo, ns=(mtime + 10**9, mtime + 10**9))
+
+def test_roundtrip_keeps_dtype(tmp_path):
+    cache = DataCache(tmp_path / 'cache')
+    archivo = _fuente(tmp_path)
+    cache.save('datos', archivo, _frames(), {'todos': False})
+    
+    frames = cache.load('datos', archivo, {'todos': False})
+    pd.testing.assert_frame_equal(frames['importacion'], _frames()['importacion'], check_freq=False)
+    assert frames['importacion']['Diesel'].dtype == np.float32
+
+def test_other_params_invalidate(tmp_path):
+    cache = DataCache(tmp_path / 'cache')
+    archivo = _fuente(tmp_path)
+    cache.save('datos', archivo, _frames(), {'todos': False})
+    
+    assert cache.load('datos', archivo, {'todos': True}) is None
+
+def test_changed_content_invalidates(tmp_path):
+    cache = DataCache(tmp_path / 'cache')
+    archivo = _fuente(tmp_path)
+    cache.save('datos', archivo, _frames())
+    
+    # Mismo tamaño y mtime distinto: se decide por el hash
+    _tocar(archivo, b'abce')
+    assert cache.load('datos', archivo) is None
+    
+    _tocar(archivo, b'abcdef')
+    assert cache.load('datos', archivo) is None
+
+def test_touched_file_with_same_content_stays_valid(tmp_path):
+    cache = DataCache(tmp_path / 'cache')
+    archivo = _fuente(tmp_path)
+    cache.save('datos', archivo, _frames())
+    
+    _tocar(archivo, b'abcd')
+    assert cache.load('datos', archivo) is not None
+    # La huella se actualiza: la próxima validación no vuelve a leer el archivo
+    assert cache._read_meta('datos')['source']['mtime_ns'] == archivo.stat().st_mtime_ns
+
+def test_missing_entry(tmp_path):
+    cache = DataCache(tmp_path / 'cache')
+    assert cache.load('datos', _fuente(tmp_path)) is None
@@ -0,0 +1,60 @@
+"""
+Pruebas de las bandas de predicción empíricas
+"""
+from pathlib import Path
+import numpy as np
+import pytest
+from utils.batch_models import baselines_batch
+from utils.conformal import add_intervals, conformal_quantiles
+from utils.data_loader import DataLoader
+
+DATA_PATH = Path(__file__).parent.parent / 'data'
+
+def test_quantile_is_the_conformal_order_statistic():
+    residuos = np.array([-5.0, 1.0, -2.0, 4.0, 3.0, np.nan, 6.0, -7.0, 8.0, 9.0, 10.0])
+    # 10 residuos válidos: ceil(11 * 0.9) = 10, el mayor error absoluto
+    assert conformal_quantiles(residuos, 0.1) == 10.0
+    # ceil(11 * 0.5) = 6: el sexto error absoluto en orden creciente
+    assert conformal_quantiles(residuos, 0.5) == 6.0
+
+def test_quantile_is_nan_without_enough_residuals():
+    assert np.isnan(conformal_quantiles(np.ones(5), 0.1))
+    assert np.isnan(conformal_quantiles(np.empty(0), 0.1))
+
+def test_quantiles_by_row_ignore_nan_padding():
+    rng = np.random.default_rng(0)
+    matriz = rng.normal(size=(3, 50))
+    matriz[1, 30:] = np.nan
+    
+    cuantiles = conformal_quantiles(matriz, 0.2)
+    
+    assert cuantiles.shape == (3,)
+    for fila, cuantil in zip(matriz, cuantiles):
+        assert cuantil == conformal_quantiles(fila[np.isfinite(fila)], 0.2)
+
+def test_coverage_with_exchangeable_residuals():
+    # Residuos de calibración y errores nuevos de la misma distribución
+    rng = np.random.default_rng(42)
+    cuantiles = conformal_quantiles(rng.standard_t(3, size=(2000, 99)), 0.1)
+    nuevos = rng.standard_t(3, size=2000)
+    
+    assert np.mean(np.abs(nuevos) <= cuantiles) == pytest.approx(0.9, abs=0.03)
+
+def test_add_intervals_scales_test_band():
+    resultado = {'predictions': {'train': np.zeros(3), 'test': np.ones(2)}}
+    add_intervals(resultado, 2.0, escala_test=np.array([1.0, 1.5]))
+    p = resultado['predictions']
+    
+    np.testing.assert_array_equal(p['lower_train'], [-2.0, -2.0, -2.0])
+    np.testing.assert_array_equal(p['upper_test'], [3.0, 4.0])
+    assert resultado['cuantil'] == 2.0
+
+def test_empirical_coverage_on_holt_winters():
+    # Las bandas no garantizan la cobertura nominal (ver conformal_quantiles);
+    # en esta serie Holt-Winters queda dentro de la tolerancia
+    _, df_consumo = DataLoader(DATA_PATH, use_cache=False, incremental=False).load_data()
+    serie = df_consumo['Gasolina superior']
+    p = baselines_batch({'serie': serie})['serie']['Holt-Winters']['predictions']
+    
+    dentro = (p['y_test'] >= p['lower_test']) & (p['y_test'] <= p['upper_test'])
+    assert dentro.mean() == pytest.approx(0.9, abs=0.05)
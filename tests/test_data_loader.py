@@ -0,0 +1,85 @@
+"""
+Pruebas de las vistas sin copia que entrega DataLoader
+"""
+from pathlib import Path
+import numpy as np
+import pytest
+from config import PRODUCTOS
+from utils.data_loader import DataLoader
+
+DATA_PATH = Path(__file__).parent.parent / 'data'
+
+@pytest.fixture(scope='module', params=[False, True], ids=['productos', 'todos'])
+def loader(request):
+    """Loader cargado sin caché, con y sin el almacén compacto"""
+    loader = DataLoader(DATA_PATH, use_cache=False, incremental=False, all_products=request.param)
+    loader.load_data()
+    return loader
+
+def _assert_protected(obj, original):
+    """Escribir en obj debe fallar o dejar intactos los datos del loader"""
+    antes = original.to_numpy().copy()
+    try:
+        obj.iloc[0] = -1.0
+    except ValueError:
+        pass
+    try:
+        obj.to_numpy()[0] = -1.0
+    except ValueError:
+        pass
+    np.testing.assert_array_equal(original.to_numpy(), antes)
+
+def test_combined_data_is_a_view(loader):
+    primero = loader.get_combined_data()
+    segundo = loader.get_combined_data()
+    
+    assert primero is not segundo
+    assert np.shares_memory(primero.to_numpy(), segundo.to_numpy())
+    assert np.shares_memory(primero.to_numpy(), loader._combined.to_numpy())
+
+def test_combined_data_is_protected(loader):
+    combinado = loader.get_combined_data()
+    _assert_protected(combinado, loader._combined)
+    
+    # Renombrar la vista no afecta al original
+    combinado.columns = [f'x{i}' for i in range(combinado.shape[1])]
+    assert loader.get_combined_data().columns[0].startswith('Importación')
+
+@pytest.mark.parametrize('tipo', ['importacion', 'consumo'])
+def test_product_series_is_a_view(loader, tipo):
+    producto = PRODUCTOS[0]
+    primera = loader.get_data_for_product(producto, tipo)[tipo]
+    segunda = loader.get_data_for_product(producto, tipo)[tipo]
+    
+    assert primera.dtype == np.float64
+    if loader.store is None:
+        df = loader.df_importacion if tipo == 'importacion' else loader.df_consumo
+        assert np.shares_memory(primera.to_numpy(), segunda.to_numpy())
+        assert np.shares_memory(primera.to_numpy(), df.to_numpy())
+    else:
+        # El almacén float32 convierte en cada consulta, sin conservar copias
+        assert not np.shares_memory(primera.to_numpy(), segunda.to_numpy())
+        np.testing.assert_array_equal(primera.to_numpy(), segunda.to_numpy())
+
+def test_product_series_is_protected(loader):
+    producto = PRODUCTOS[0]
+    serie = loader.get_data_for_product(producto, 'importacion')['importacion']
+    original = loader.get_data_for_product(producto, 'importacion')['importacion']
+    _assert_protected(serie, original)
+
+def test_aggregation_is_a_view(loader):
+    primera = loader.get_aggregation('anual', 'sum')
+    segunda = loader.get_aggregation('anual', 'sum')
+    cube = loader.get_aggregate_cube()
+    
+    for tipo in ('importacion', 'consumo'):
+        assert primera[tipo].dtypes.eq(np.float64).all()
+        assert np.shares_memory(primera[tipo].to_numpy(), segunda[tipo].to_numpy())
+        assert np.shares_memory(
+            primera[tipo].to_numpy(), cube.get(tipo, 'anual', 'sum', PRODUCTOS).to_numpy()
+        )
+
+def test_aggregation_is_protected(loader):
+    tabla = loader.get_aggregation('anual', 'sum')['importacion']
+    original = loader.get_aggregate_cube().get('importacion', 'anual', 'sum', PRODUCTOS)
+    _assert_protected(tabla, original)
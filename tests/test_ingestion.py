@@ -0,0 +1,70 @@
+"""
+Pruebas de la ingesta incremental de publicaciones mensuales
+"""
+import numpy as np
+import pandas as pd
+from utils.ingestion import IncrementalIngestor
+
+PATRON = 'IMPORTACION-*.xlsx'
+
+def _publicacion(carpeta, mes, valor, meses=3):
+    """Crea el archivo de una publicación y retorna (ruta, filas leídas)"""
+    archivo = carpeta / f'IMPORTACION-{mes}.xlsx'
+    archivo.write_bytes(f'{mes}-{valor}'.encode())
+    fin = pd.Period(mes, 'M')
+    fechas = pd.period_range(end=fin, periods=meses, freq='M').to_timestamp()
+    df = pd.DataFrame(
+        {'Diesel': np.full(meses, float(valor))}, index=pd.DatetimeIndex(fechas, name='Fecha')
+    )
+    return archivo, df
+
+def _ingestor(carpeta):
+    return IncrementalIngestor(carpeta, carpeta / '.store', PATRON, 'prueba', ['Fecha', 'Diesel'])
+
+def test_only_new_files_are_pending(tmp_path):
+    ingestor = _ingestor(tmp_path)
+    marzo = _publicacion(tmp_path, '2025-03', 3)
+    assert ingestor.pending_files() == [marzo[0]]
+    
+    ingestor.append(dict([marzo]))
+    assert ingestor.pending_files() == []
+    
+    mayo = _publicacion(tmp_path, '2025-05', 5)
+    assert ingestor.pending_files() == [mayo[0]]
+
+def test_newer_release_wins_on_overlapping_months(tmp_path):
+    ingestor = _ingestor(tmp_path)
+    ingestor.append(dict([_publicacion(tmp_path, '2025-03', 3)]))
+    ingestor.append(dict([_publicacion(tmp_path, '2025-05', 5)]))
+    
+    # Se republica la de marzo después de la de mayo
+    republicada = _publicacion(tmp_path, '2025-03', 30)
+    assert ingestor.pending_files() == [republicada[0]]
+    df = ingestor.append(dict([republicada]))
+    
+    esperado = pd.Series(
+        [30.0, 30.0, 5.0, 5.0, 5.0],
+        index=pd.date_range('2025-01-01', periods=5, freq='MS'),
+        name='Diesel'
+    )
+    pd.testing.assert_series_equal(df['Diesel'], esperado, check_names=False, check_freq=False,
+                                   check_index_type=False)
+    pd.testing.assert_frame_equal(ingestor.load(), df)
+
+def test_release_order_does_not_depend_on_append_order(tmp_path):
+    ingestor = _ingestor(tmp_path)
+    mayo = _publicacion(tmp_path, '2025-05', 5)
+    marzo = _publicacion(tmp_path, '2025-03', 3)
+    df = ingestor.append(dict([mayo, marzo]))
+    
+    assert df.loc['2025-03-01', 'Diesel'] == 5.0
+    assert df.loc['2025-01-01', 'Diesel'] == 3.0
+    assert df.index.is_monotonic_increasing
+
+def test_store_persists_between_instances(tmp_path):
+    assert _ingestor(tmp_path).load() is None
+    df = _ingestor(tmp_path).append(dict([_publicacion(tmp_path, '2025-03', 3)]))
+    
+    otro = _ingestor(tmp_path)
+    assert otro.pending_files() == []
+    pd.testing.assert_frame_equal(otro.load(), df, check_freq=False)
@@ -0,0 +1,44 @@
+"""
+Pruebas de la búsqueda de órdenes SARIMA
+"""
+from pathlib import Path
+import pandas as pd
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+from config import PRODUCTOS, SARIMA_SEARCH_CONFIG
+from utils.data_loader import DataLoader
+from utils.order_search import SarimaOrderSearch
+from utils.predictive_models import PredictiveModels
+
+DATA_PATH = Path(__file__).parent.parent / 'data'
+
+@pytest.fixture(scope='module')
+def frames():
+    loader = DataLoader(DATA_PATH, use_cache=False, incremental=False)
+    df_importacion, df_consumo = loader.load_data()
+    return {'importacion': df_importacion, 'consumo': df_consumo}
+
+def _train(serie, test_size):
+    """Tramo de entrenamiento normalizado, como en train_sarima"""
+    serie = serie.dropna()
+    normalizada = MinMaxScaler().fit_transform(serie.values.reshape(-1, 1)).flatten() * 10
+    return pd.Series(normalizada, index=serie.index).iloc[:int(len(serie) * (1 - test_size))]
+
+@pytest.mark.parametrize('flujo', ['importacion', 'consumo'])
+@pytest.mark.parametrize('producto', PRODUCTOS)
+def test_pruning_keeps_exhaustive_winner(frames, flujo, producto):
+    modelos = PredictiveModels()
+    busqueda = modelos.order_search
+    # Sin poda: todos los candidatos se ajustan completos y llegan a la final
+    exhaustiva = SarimaOrderSearch(
+        **SARIMA_SEARCH_CONFIG['grid'],
+        criterio=busqueda.criterio,
+        maxiter=busqueda.maxiter,
+        maxiter_poda=busqueda.maxiter,
+        margen_poda=float('inf'),
+        finalistas=len(busqueda.candidatos),
+        parallel=busqueda.parallel
+    )
+    train = _train(frames[flujo][producto], modelos.test_size)
+    
+    assert busqueda.select(train) == exhaustiva.select(train)
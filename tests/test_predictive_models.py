@@ -0,0 +1,84 @@
+"""
+Pruebas de PredictiveModels
+"""
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from utils import predictive_models
+from utils.data_loader import DataLoader
+from utils.features import series_key
+from utils.predictive_models import PredictiveModels
+
+DATA_PATH = Path(__file__).parent.parent / 'data'
+
+def _serie(n=96, semilla=0, nombre='serie'):
+    """Serie mensual con tendencia, estacionalidad y ruido"""
+    rng = np.random.default_rng(semilla)
+    t = np.arange(n)
+    valores = 1000 + 5 * t + 100 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 10, n)
+    fechas = pd.date_range('2010-01-01', periods=n, freq='MS', name='Fecha')
+    return pd.Series(valores, index=fechas, name=nombre)
+
+def test_memos_are_bounded(monkeypatch):
+    monkeypatch.setattr(predictive_models, 'MEMO_MAX', 3)
+    modelos = PredictiveModels()
+    series = [_serie(semilla=i) for i in range(5)]
+    
+    for serie in series:
+        modelos.prepare_data(serie)
+        modelos.forecast(serie, 'Linear Regression', horizon=3)
+        
+    assert len(modelos._features) == 3
+    assert len(modelos._forecasts) == 3
+    # Se conservan las entradas usadas más recientemente
+    primero = modelos.prepare_data(series[2])
+    assert modelos.prepare_data(series[2]) is primero
+    modelos.prepare_data(series[0])
+    assert len(modelos._features) == 3
+
+@pytest.fixture(scope='module')
+def consumo():
+    _, df_consumo = DataLoader(DATA_PATH, use_cache=False, incremental=False).load_data()
+    return df_consumo['Gasolina regular']
+
+@pytest.mark.parametrize('global_model', [False, True], ids=['por_serie', 'global'])
+@pytest.mark.parametrize('model_name', ['Linear Regression', 'Random Forest'])
+def test_forecast_follows_last_observations(consumo, model_name, global_model):
+    modelos = PredictiveModels()
+    pronostico = modelos.forecast({'consumo': consumo}, model_name, horizon=12,
+                                  global_model=global_model)['consumo']
+                                  
+    # El tramo de prueba supera al de entrenamiento: un modelo ajustado solo
+    # con el entrenamiento (el bosque no extrapola) queda por debajo
+    _, _, y_train, _, _ = modelos.prepare_data(consumo)
+    recientes = consumo.iloc[-12:]
+    assert recientes.min() > y_train.max()
+    assert pronostico.min() > y_train.max()
+    assert abs(pronostico.mean() / recientes.mean() - 1) < 0.1
+
+def test_forecast_fit_is_cached_apart_from_evaluation(consumo):
+    modelos = PredictiveModels()
+    evaluado = modelos.train_random_forest(consumo)
+    modelos.forecast(consumo, 'Random Forest', horizon=6)
+    ajuste = modelos._full_fits[(series_key(consumo), 'Random Forest')]
+    
+    assert ajuste is not evaluado['model']
+    assert ajuste.n_features_in_ == evaluado['model'].n_features_in_
+    # Otro horizonte reutiliza el ajuste sobre la serie completa
+    modelos.forecast(consumo, 'Random Forest', horizon=12)
+    assert modelos._full_fits[(series_key(consumo), 'Random Forest')] is ajuste
+
+def test_prepare_data_matches_row_loop():
+    serie = _serie(n=60)
+    X_train, X_test, y_train, y_test, fechas = PredictiveModels().prepare_data(serie, lookback=12)
+    
+    # Una ventana por fila, como en la versión con bucle
+    X = np.array([serie.iloc[i - 12:i].to_numpy() for i in range(12, len(serie))])
+    y = serie.to_numpy()[12:]
+    corte = int(len(X) * 0.8)
+    np.testing.assert_array_equal(X_train, X[:corte])
+    np.testing.assert_array_equal(X_test, X[corte:])
+    np.testing.assert_array_equal(y_train, y[:corte])
+    np.testing.assert_array_equal(y_test, y[corte:])
+    assert fechas.equals(serie.index[12:])
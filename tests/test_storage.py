@@ -0,0 +1,66 @@
+"""
+Pruebas del backend SQLite frente a las consultas en memoria
+"""
+import shutil
+from pathlib import Path
+import pandas as pd
+import pytest
+from utils.data_loader import DataLoader
+
+DATA_PATH = Path(__file__).parent.parent / 'data'
+
+NIVELES = ['anual', 'trimestral', 'mensual', 'anio_mes']
+ESTADISTICAS = ['sum', 'mean', 'min', 'max', 'count']
+
+@pytest.fixture(scope='module', params=[False, True], ids=['productos', 'todos'])
+def loaders(request, tmp_path_factory):
+    """Un loader con backend SQLite y otro en memoria sobre los mismos datos"""
+    carpeta = tmp_path_factory.mktemp('datos')
+    for archivo in DATA_PATH.glob('*.xlsx'):
+        shutil.copy(archivo, carpeta)
+        
+    memoria = DataLoader(carpeta, use_cache=False, all_products=request.param)
+    memoria.load_data()
+    sqlite = DataLoader(carpeta, use_cache=False, all_products=request.param, backend='sqlite')
+    sqlite.load_data()
+    return memoria, sqlite
+
+@pytest.mark.parametrize('estadistica', ESTADISTICAS)
+@pytest.mark.parametrize('nivel', NIVELES)
+def test_aggregation_matches_cube(loaders, nivel, estadistica):
+    memoria, sqlite = loaders
+    esperado = memoria.get_aggregation(nivel, estadistica)
+    obtenido = sqlite.get_aggregation(nivel, estadistica)
+    
+    for tipo in ('importacion', 'consumo'):
+        pd.testing.assert_frame_equal(
+            obtenido[tipo], esperado[tipo], check_dtype=False, check_index_type=False,
+            check_names=False, rtol=1e-9
+        )
+
+@pytest.mark.parametrize('tipo', ['importacion', 'consumo'])
+def test_range_queries_match_memory(loaders, tipo):
+    memoria, sqlite = loaders
+    producto = memoria.get_products(tipo)[0]
+    rangos = [(None, None), ('2010-01-01', '2015-06-01'), ('2018-03-15', None), (None, '2005-12-31')]
+    
+    for inicio, fin in rangos:
+        pd.testing.assert_series_equal(
+            sqlite.query(producto, tipo, inicio, fin), memoria.query(producto, tipo, inicio, fin),
+            check_freq=False, check_index_type=False, check_names=False
+        )
+        assert sqlite.get_range_total(producto, tipo, inicio, fin) == pytest.approx(
+            memoria.get_range_total(producto, tipo, inicio, fin), rel=1e-12
+        )
+        assert sqlite.get_range_mean(producto, tipo, inicio, fin) == pytest.approx(
+            memoria.get_range_mean(producto, tipo, inicio, fin), rel=1e-12
+        )
+
+def test_unchanged_data_is_not_rewritten(loaders, monkeypatch):
+    _, sqlite = loaders
+    
+    def escribir(*args):
+        raise AssertionError("La base no debería reescribirse")
+        
+    monkeypatch.setattr(sqlite.backend, 'write_series', escribir)
+    sqlite.load_data()
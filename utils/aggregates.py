@@ -0,0 +1,63 @@
+"""
+Cubo de agregaciones precalculadas por período
+"""
+import numpy as np
+from utils.frames import read_only_frame
+
+# Niveles de agregación: nombre -> (claves de agrupación, nombres del índice)
+NIVELES = {
+    'anual': (lambda idx: [idx.year], ['Año']),
+    'trimestral': (lambda idx: [idx.year, idx.quarter], ['Año', 'Trimestre']),
+    'mensual': (lambda idx: [idx.month], ['Mes']),
+    'anio_mes': (lambda idx: [idx.year, idx.month], ['Año', 'Mes']),
+}
+
+ESTADISTICAS = ['sum', 'mean', 'min', 'max', 'count']
+
+class AggregateCube:
+    """
+    Agregaciones de todos los flujos y productos, calculadas una sola vez
+    
+    Para cada flujo, nivel (año, trimestre, mes del año, año-mes) y
+    estadística se guarda un DataFrame (período x producto). Las consultas
+    son búsquedas en un diccionario y retornan siempre el mismo objeto, cuyos
+    valores son de solo lectura.
+    """
+    
+    def __init__(self, frames):
+        """
+        Args:
+            frames: Diccionario {flujo: DataFrame indexado por fecha}
+        """
+        self.tablas = {}
+        self._proyecciones = {}
+        
+        for flujo, df in frames.items():
+            # Se acumula en float64 aunque los datos vengan en float32
+            df = df.astype(np.float64)
+            for nivel, (claves, nombres) in NIVELES.items():
+                agregado = df.groupby(claves(df.index)).agg(ESTADISTICAS)
+                agregado.index.names = nombres
+                for estadistica in ESTADISTICAS:
+                    tabla = agregado.xs(estadistica, axis=1, level=1)
+                    tabla.columns.name = None
+                    self.tablas[(flujo, nivel, estadistica)] = read_only_frame(tabla)
+                    
+    def get(self, flujo, nivel, estadistica, productos=None):
+        """
+        Retorna una agregación precalculada
+        
+        Args:
+            flujo: 'importacion' o 'consumo'
+            nivel: 'anual', 'trimestral', 'mensual' o 'anio_mes'
+            estadistica: 'sum', 'mean', 'min', 'max' o 'count'
+            productos: Subconjunto de productos (la proyección se memoiza)
+        """
+        tabla = self.tablas[(flujo, nivel, estadistica)]
+        if productos is None or list(productos) == tabla.columns.tolist():
+            return tabla
+            
+        clave = (flujo, nivel, estadistica, tuple(productos))
+        if clave not in self._proyecciones:
+            self._proyecciones[clave] = read_only_frame(tabla[list(productos)])
+        return self._proyecciones[clave]
@@ -0,0 +1,143 @@
+"""
+Almacén en disco de modelos entrenados
+"""
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+class ModelArtifactStore:
+    """
+    Resultados de entrenamiento (modelo ajustado, predicciones y métricas)
+    guardados en disco con desalojo LRU por tamaño
+    
+    La clave de cada artefacto combina la huella de la serie, el modelo y
+    sus hiperparámetros, por lo que un cambio en cualquiera de ellos produce
+    una entrada nueva. El mtime de cada archivo marca su último uso. Los
+    alias (.ref) se desalojan junto con el artefacto al que apuntan.
+    """
+    
+    def __init__(self, store_dir, max_bytes=256 * 2**20):
+        """
+        Args:
+            store_dir: Carpeta de los artefactos
+            max_bytes: Tamaño máximo en disco antes de desalojar los menos usados
+        """
+        self.store_dir = Path(store_dir)
+        self.max_bytes = max_bytes
+        
+    @staticmethod
+    def key(serie_key, model_name, params):
+        """
+        Retorna la clave de un artefacto
+        
+        Args:
+            serie_key: Huella del contenido de la serie
+            model_name: Nombre del modelo
+            params: Hiperparámetros del modelo
+        """
+        contenido = json.dumps(
+            {'serie': serie_key, 'modelo': model_name, 'params': params},
+            sort_keys=True,
+            default=list
+        )
+        return hashlib.sha256(contenido.encode()).hexdigest()
+        
+    @staticmethod
+    def alias_key(nombre, model_name, params):
+        """
+        Retorna la clave del alias "último modelo" de una serie por nombre
+        
+        A diferencia de key(), no depende del contenido de la serie: permite
+        encontrar el modelo de la versión anterior de los datos.
+        """
+        contenido = json.dumps(
+            {'nombre': nombre, 'modelo': model_name, 'params': params},
+            sort_keys=True,
+            default=list
+        )
+        return hashlib.sha256(contenido.encode()).hexdigest()
+        
+    def _path(self, clave):
+        return self.store_dir / f'{clave}.pkl'
+        
+    def latest(self, alias):
+        """Retorna la clave del último artefacto guardado para un alias, o None"""
+        try:
+            return (self.store_dir / f'{alias}.ref').read_text(encoding='utf-8').strip()
+        except OSError:
+            return None
+            
+    def set_latest(self, alias, clave):
+        """Apunta un alias a un artefacto"""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        path = self.store_dir / f'{alias}.ref'
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_path.write_text(clave, encoding='utf-8')
+        os.replace(tmp_path, path)
+        
+    def load(self, clave):
+        """Retorna el artefacto guardado, o None si no existe o está dañado"""
+        if clave is None:
+            return None
+        path = self._path(clave)
+        try:
+            with open(path, 'rb') as f:
+                resultado = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Artefacto incompleto o de otra versión: se descarta
+            path.unlink(missing_ok=True)
+            return None
+            
+        # Marcar como usado recientemente
+        os.utime(path)
+        return resultado
+        
+    def save(self, clave, resultado):
+        """Guarda un artefacto de forma atómica y desaloja si se excede el tamaño"""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(clave)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(resultado, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._evict()
+        
+    def size(self):
+        """Retorna el tamaño total de los artefactos en bytes"""
+        return sum(path.stat().st_size for path in self.store_dir.glob('*.pkl'))
+        
+    def _evict(self):
+        """Elimina los artefactos menos usados hasta respetar max_bytes"""
+        archivos = []
+        for path in self.store_dir.glob('*.pkl'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            archivos.append((stat.st_mtime_ns, stat.st_size, path))
+            
+        total = sum(tamano for _, tamano, _ in archivos)
+        desalojados = False
+        for _, tamano, path in sorted(archivos):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= tamano
+            desalojados = True
+
+        if desalojados:
+            self._evict_aliases()
+            
+    def _evict_aliases(self):
+        """Elimina los alias que apuntan a artefactos que ya no existen"""
+        for path in self.store_dir.glob('*.ref'):
+            try:
+                clave = path.read_text(encoding='utf-8').strip()
+            except OSError:
+                continue
+            if not self._path(clave).exists():
+                path.unlink(missing_ok=True)
@@ -0,0 +1,191 @@
+"""
+Entrenamiento de modelos en segundo plano
+"""
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from utils.features import series_key
+from utils.training import MODELOS_LOTE, ORDEN_ENVIO, train_batched_results, train_one
+
+class BackgroundTrainer:
+    """
+    Administrador de entrenamiento en segundo plano
+    
+    Los trabajos (serie, modelo) se despachan a un pool de procesos sin
+    bloquear al llamador; los resultados y los errores se publican desde el
+    hilo del pool a medida que llegan. Los trabajos prioritarios (lo que el
+    usuario está viendo) se despachan primero.
+    Pensado para vivir en st.cache_resource, entre reruns y sesiones.
+    """
+    
+    def __init__(self, test_size=0.2, random_state=42, artifacts=None, parallel=True,
+                 max_workers=None):
+        """
+        Args:
+            test_size: Proporción de datos de prueba
+            random_state: Semilla de los modelos aleatorios
+            artifacts: ModelArtifactStore opcional, compartido con los procesos
+            parallel: Si se entrena en un pool de procesos (si no, en un hilo)
+            max_workers: Número máximo de procesos (por defecto, uno por CPU)
+        """
+        self.test_size = test_size
+        self.random_state = random_state
+        self.artifacts = artifacts
+        if parallel:
+            self._pool = ProcessPoolExecutor(max_workers=max_workers)
+            self._slots = max_workers or os.cpu_count() or 1
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=1)
+            self._slots = 1
+            
+        # Reentrante: un futuro que ya terminó ejecuta su callback al registrarlo
+        self._lock = threading.RLock()
+        self._cola = deque()
+        self._en_curso = 0
+        self._huellas = {}       # (serie, modelo) -> huella de la serie vigente
+        self._series = {}        # clave -> serie pendiente de despachar
+        self._estados = {}       # clave -> 'pendiente', 'listo' o 'fallido'
+        self._resultados = {}    # clave -> TrainingResult
+        self._errores = {}       # clave -> mensaje de la excepción de un trabajo fallido
+        
+    def submit(self, nombre, serie, model_name, prioridad=False):
+        """
+        Encola el entrenamiento de un modelo si no está hecho ni en curso
+        
+        Args:
+            nombre: Nombre de la serie
+            serie: Serie temporal
+            model_name: Nombre del modelo
+            prioridad: Si el trabajo pasa al frente de la cola
+        """
+        clave = (nombre, model_name, series_key(serie.dropna()))
+        with self._lock:
+            self._huellas[(nombre, model_name)] = clave[2]
+            if clave not in self._estados:
+                self._estados[clave] = 'pendiente'
+                self._series[clave] = serie
+                if prioridad:
+                    self._cola.appendleft(clave)
+                else:
+                    self._cola.append(clave)
+            elif prioridad and clave in self._cola:
+                self._cola.remove(clave)
+                self._cola.appendleft(clave)
+            self._dispatch()
+            
+    def submit_all(self, series):
+        """
+        Encola todos los modelos de todas las series
+        
+        Args:
+            series: Diccionario {nombre de la serie: Serie temporal}
+        """
+        # Los modelos por lotes nuevos se ajustan todos juntos, en el momento
+        huellas = {nombre: series_key(serie.dropna()) for nombre, serie in series.items()}
+        nuevas = []
+        with self._lock:
+            for model_name in MODELOS_LOTE:
+                for nombre in series:
+                    clave = (nombre, model_name, huellas[nombre])
+                    self._huellas[clave[:2]] = clave[2]
+                    if clave not in self._estados:
+                        self._estados[clave] = 'pendiente'
+                        nuevas.append(clave)
+        if nuevas:
+            try:
+                lote = train_batched_results(
+                    series, [clave[:2] for clave in nuevas], self.test_size, self.random_state,
+                    self.artifacts
+                )
+            except Exception as e:
+                # Sin publicar el fallo, los trabajos quedarían pendientes para siempre
+                lote, error = {}, f"{type(e).__name__}: {e}"
+            else:
+                error = None
+            with self._lock:
+                for clave in nuevas:
+                    self._publish(clave, lote.get(clave[:2]), error)
+                    
+        for model_name in ORDEN_ENVIO:
+            if model_name in MODELOS_LOTE:
+                continue
+            for nombre, serie in series.items():
+                self.submit(nombre, serie, model_name)
+                
+    def _dispatch(self):
+        """Envía trabajos al pool mientras haya procesos libres (con el lock tomado)"""
+        while self._cola and self._en_curso < self._slots:
+            clave = self._cola.popleft()
+            serie = self._series.pop(clave)
+            try:
+                futuro = self._pool.submit(
+                    train_one, serie, clave[1], self.test_size, self.random_state, self.artifacts,
+                    clave[0]
+                )
+            except RuntimeError:
+                # El pool ya se cerró (fin del proceso): no se despacha nada más
+                self._cola.clear()
+                self._series.clear()
+                return
+            self._en_curso += 1
+            futuro.add_done_callback(lambda f, clave=clave: self._on_done(clave, f))
+            
+    def _on_done(self, clave, futuro):
+        """Publica el resultado de un trabajo terminado y despacha el siguiente"""
+        resultado, error = None, None
+        try:
+            resultado = futuro.result()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            
+        with self._lock:
+            self._en_curso -= 1
+            self._publish(clave, resultado, error)
+            self._dispatch()
+            
+    def _publish(self, clave, resultado, error=None):
+        """Registra el resultado o el error de un trabajo (con el lock tomado)"""
+        if resultado is not None:
+            self._resultados[clave] = resultado
+        elif error is not None:
+            self._errores[clave] = error
+        self._estados[clave] = 'listo' if resultado is not None else 'fallido'
+            
+    def _clave(self, nombre, model_name):
+        huella = self._huellas.get((nombre, model_name))
+        return None if huella is None else (nombre, model_name, huella)
+        
+    def get(self, nombre, model_name):
+        """Retorna el TrainingResult de un modelo, o None si aún no está listo"""
+        with self._lock:
+            return self._resultados.get(self._clave(nombre, model_name))
+            
+    def status(self, nombre, model_name):
+        """Retorna 'pendiente', 'listo', 'fallido' o None si no fue encolado"""
+        with self._lock:
+            return self._estados.get(self._clave(nombre, model_name))
+            
+    def error(self, nombre, model_name):
+        """
+        Retorna el mensaje del error de un trabajo fallido
+        
+        Es None si el trabajo no falló o si falló sin excepción (serie
+        demasiado corta para el modelo)
+        """
+        with self._lock:
+            return self._errores.get(self._clave(nombre, model_name))
+            
+    def progress(self):
+        """Retorna (trabajos terminados, trabajos totales) de los datos vigentes"""
+        with self._lock:
+            claves = [(nombre, modelo, huella) for (nombre, modelo), huella in self._huellas.items()]
+            terminados = sum(self._estados[clave] != 'pendiente' for clave in claves)
+            return terminados, len(claves)
+            
+    def shutdown(self):
+        """Cancela los trabajos no despachados y cierra el pool"""
+        with self._lock:
+            self._cola.clear()
+            self._series.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,141 @@
+"""
+Backtest con origen móvil (ventana expansiva) de los modelos predictivos
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from config import BACKTEST_CONFIG
+from utils.features import lag_matrix
+from utils.predictive_models import (HIPERPARAMETROS, MODELOS, PredictiveModels, metrics_table,
+                                     split_metrics)
+
+# Modelos que se evalúan sobre la matriz de rezagos compartida
+MODELOS_REZAGOS = ['Linear Regression', 'Random Forest']
+
+# Modelos evaluados por defecto. SARIMA queda fuera: repite la búsqueda de
+# órdenes en cada fold y cuesta más que todos los demás juntos
+MODELOS_BACKTEST = [model_name for model_name in MODELOS if model_name != 'SARIMA']
+
+def rolling_origins(n, horizonte, paso, min_train):
+    """
+    Retorna los orígenes de cada fold: cuántos valores de la serie quedan
+    en entrenamiento; la prueba son los `horizonte` valores siguientes
+    """
+    return list(range(min_train, n - horizonte + 1, paso))
+
+def lag_fold(model_name, X_train, y_train, X_test, y_test, random_state=42):
+    """
+    Ajusta un modelo de rezagos en un fold y retorna sus métricas
+    
+    Es una función de módulo para poder ejecutarse en un pool de procesos.
+    """
+    model = PredictiveModels(random_state=random_state).fit_lag_model(model_name, X_train, y_train)
+    return split_metrics(y_train, model.predict(X_train), y_test, model.predict(X_test))
+
+def series_fold(serie, model_name, origen, random_state=42):
+    """
+    Entrena un modelo sobre la serie recortada al final del fold y retorna
+    sus métricas (None si el modelo no pudo entrenarse)
+    
+    Args:
+        serie: Serie hasta el final de la prueba del fold
+        model_name: Nombre del modelo (ver MODELOS)
+        origen: Valores de entrenamiento del fold
+        random_state: Semilla de los modelos aleatorios
+    """
+    resultado = PredictiveModels(random_state=random_state).train_model(
+        serie, model_name, split_idx=origen
+    )
+    return resultado['metrics'] if resultado is not None else None
+
+def backtest(serie, model_names=None, horizonte=None, paso=None, min_train=None,
+             random_state=42, parallel=None, max_workers=None):
+    """
+    Evalúa modelos con origen móvil y ventana expansiva
+    
+    Cada fold entrena con todos los valores anteriores a su origen y prueba
+    sobre los `horizonte` siguientes; los orígenes avanzan de a `paso`. La
+    matriz de rezagos se construye una sola vez y cada fold usa un recorte;
+    todos los (modelo, fold) se ajustan en un pool de procesos.
+    
+    Args:
+        serie: Serie temporal
+        model_names: Modelos a evaluar (por defecto, MODELOS_BACKTEST; SARIMA
+            hay que pedirlo explícitamente)
+        horizonte, paso, min_train: Meses de prueba por fold, meses entre
+            orígenes y meses de entrenamiento del primer fold (por defecto,
+            los de BACKTEST_CONFIG)
+        random_state: Semilla de los modelos aleatorios
+        parallel: Si los folds se ajustan en un pool de procesos
+        max_workers: Número máximo de procesos (por defecto, uno por CPU)
+        
+    Returns:
+        Tupla (por_fold, agregado): por_fold tiene las columnas de
+        compare_models más 'Fold' y 'Origen'; agregado tiene las de
+        compare_models con el promedio de las métricas de los folds
+    """
+    horizonte = horizonte or BACKTEST_CONFIG['horizonte']
+    paso = paso or BACKTEST_CONFIG['paso']
+    min_train = min_train or BACKTEST_CONFIG['min_train']
+    parallel = BACKTEST_CONFIG['parallel'] if parallel is None else parallel
+    max_workers = max_workers or BACKTEST_CONFIG['max_workers']
+    model_names = list(MODELOS_BACKTEST if model_names is None else model_names)
+    
+    serie = serie.dropna()
+    origenes = rolling_origins(len(serie), horizonte, paso, min_train)
+    if not origenes:
+        raise ValueError("La serie es demasiado corta para el backtest")
+        
+    # Trabajos (modelo, fold) -> (función, argumentos)
+    trabajos = {}
+    matrices = {}
+    for model_name in model_names:
+        if model_name in MODELOS_REZAGOS:
+            lookback = HIPERPARAMETROS[model_name]['lookback']
+            if lookback not in matrices:
+                matrices[lookback] = lag_matrix(serie.to_numpy(dtype=np.float64), lookback)
+            X, y = matrices[lookback]
+            for fold, origen in enumerate(origenes):
+                corte = origen - lookback
+                trabajos[(model_name, fold)] = (lag_fold, (
+                    model_name, X[:corte], y[:corte],
+                    X[corte:corte + horizonte], y[corte:corte + horizonte], random_state
+                ))
+        else:
+            for fold, origen in enumerate(origenes):
+                trabajos[(model_name, fold)] = (series_fold, (
+                    serie.iloc[:origen + horizonte], model_name, origen, random_state
+                ))
+                
+    # Dentro de un trabajador de otro pool se ajusta en serie
+    max_workers = min(max_workers or os.cpu_count() or 1, len(trabajos))
+    if parallel and max_workers > 1 and multiprocessing.parent_process() is None:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futuros = {clave: pool.submit(funcion, *args) for clave, (funcion, args) in trabajos.items()}
+            metricas = {clave: futuro.result() for clave, futuro in futuros.items()}
+    else:
+        metricas = {clave: funcion(*args) for clave, (funcion, args) in trabajos.items()}
+        
+    tablas = []
+    for fold, origen in enumerate(origenes):
+        tabla = metrics_table({model_name: metricas[(model_name, fold)] for model_name in model_names})
+        tabla.insert(0, 'Origen', serie.index[origen])
+        tabla.insert(0, 'Fold', fold + 1)
+        tablas.append(tabla)
+    por_fold = pd.concat(tablas, ignore_index=True)
+    
+    promedios = {}
+    for model_name in model_names:
+        folds = [metricas[(model_name, fold)] for fold in range(len(origenes))]
+        folds = [m for m in folds if m is not None]
+        promedios[model_name] = {
+            tramo: {
+                clave: float(np.mean([m[tramo][clave] for m in folds]))
+                for clave in ('mse', 'mae', 'r2')
+            }
+            for tramo in ('train', 'test')
+        } if folds else None
+        
+    return por_fold, metrics_table(promedios)
@@ -0,0 +1,408 @@
+"""
+Modelos vectorizados que se ajustan sobre varias series a la vez
+"""
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from config import MODEL_CONFIG
+from utils.conformal import add_intervals, conformal_quantiles
+from utils.features import lag_matrix
+
+class LagBatch:
+    """
+    Matrices de rezagos de varias series apiladas en un solo arreglo
+    
+    Las series de distinto largo se rellenan con filas de ceros al final;
+    como esas filas no aportan a los productos X'X ni X'y, todas las series
+    se resuelven juntas sin afectar sus coeficientes.
+    """
+    
+    def __init__(self, series, lookback=12, test_size=0.2):
+        """
+        Args:
+            series: Diccionario {nombre: Serie temporal}
+            lookback: Número de períodos anteriores a usar como features
+            test_size: Proporción de datos de prueba de cada serie
+        """
+        self.nombres = list(series)
+        self.lookback = lookback
+        self.dates = []
+        
+        matrices = []
+        for nombre in self.nombres:
+            serie = series[nombre].dropna()
+            matrices.append(lag_matrix(serie.to_numpy(dtype=np.float64), lookback))
+            self.dates.append(serie.index[lookback:])
+            
+        self.n = np.array([len(y) for _, y in matrices], dtype=np.int64)
+        self.n_train = (self.n * (1 - test_size)).astype(np.int64)
+        
+        n_max = int(self.n.max()) if len(self.n) else 0
+        self.X = np.zeros((len(matrices), n_max, lookback))
+        self.y = np.zeros((len(matrices), n_max))
+        for b, (X, y) in enumerate(matrices):
+            self.X[b, :len(y)] = X
+            self.y[b, :len(y)] = y
+            
+        filas = np.arange(n_max)
+        self.train_mask = filas < self.n_train[:, None]
+        self.test_mask = (filas >= self.n_train[:, None]) & (filas < self.n[:, None])
+
+def batch_metrics(y, pred, mask):
+    """
+    Retorna MSE, MAE y R² de cada serie considerando solo las filas de la máscara
+    
+    Args:
+        y: Valores reales (series, filas)
+        pred: Predicciones (series, filas)
+        mask: Filas válidas (series, filas)
+    """
+    n = mask.sum(axis=1)
+    error = np.where(mask, y - pred, 0.0)
+    media = np.where(mask, y, 0.0).sum(axis=1) / n
+    ss_res = (error ** 2).sum(axis=1)
+    ss_tot = (np.where(mask, y - media[:, None], 0.0) ** 2).sum(axis=1)
+    
+    # Serie constante: mismo criterio que r2_score (1 si es exacta, 0 si no)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.where(ss_res == 0, 1.0, 0.0))
+    return {
+        'mse': ss_res / n,
+        'mae': np.abs(error).sum(axis=1) / n,
+        'r2': r2
+    }
+
+def fit_linear_batch(X, y, mask):
+    """
+    Ajusta una regresión lineal con intercepto por serie en una sola llamada
+    
+    Se centran los datos de cada serie y se resuelven las ecuaciones normales
+    de todas las series juntas; la pseudoinversa de X'X (features x features)
+    da la solución de norma mínima aun si alguna serie es degenerada.
+    
+    Args:
+        X: Features (series, filas, features)
+        y: Objetivos (series, filas)
+        mask: Filas de entrenamiento (series, filas)
+        
+    Returns:
+        Tupla (coeficientes (series, features), interceptos (series,))
+    """
+    peso = mask.astype(np.float64)
+    n = peso.sum(axis=1)
+    x_media = np.einsum('bn,bnf->bf', peso, X) / n[:, None]
+    y_media = (peso * y).sum(axis=1) / n
+    
+    # Centrar solo las filas válidas: el relleno debe seguir en cero
+    Xc = (X - x_media[:, None, :]) * peso[:, :, None]
+    yc = (y - y_media[:, None]) * peso
+    
+    XcT = Xc.transpose(0, 2, 1)
+    coef = (np.linalg.pinv(XcT @ Xc) @ (XcT @ yc[:, :, None]))[:, :, 0]
+    intercepto = y_media - np.einsum('bf,bf->b', x_media, coef)
+    return coef, intercepto
+
+def linear_regression_batch(series, lookback=12, test_size=0.2,
+                            alpha=MODEL_CONFIG['interval_alpha']):
+    """
+    Entrena una Regresión Lineal por serie, todas en una sola pasada
+    
+    Args:
+        series: Diccionario {nombre: Serie temporal}
+        lookback: Número de períodos anteriores a usar como features
+        test_size: Proporción de datos de prueba de cada serie
+        alpha: Nivel de error nominal de las bandas de predicción
+        
+    Returns:
+        Diccionario {nombre: resultado}, con la misma estructura que
+        PredictiveModels.train_linear_regression
+    """
+    lote = LagBatch(series, lookback, test_size)
+    coef, intercepto = fit_linear_batch(lote.X, lote.y, lote.train_mask)
+    pred = np.einsum('bnf,bf->bn', lote.X, coef) + intercepto[:, None]
+    
+    metricas = {
+        'train': batch_metrics(lote.y, pred, lote.train_mask),
+        'test': batch_metrics(lote.y, pred, lote.test_mask)
+    }
+    cuantiles = conformal_quantiles(np.where(lote.train_mask, lote.y - pred, np.nan), alpha)
+    
+    resultados = {}
+    for b, nombre in enumerate(lote.nombres):
+        # Modelo de sklearn con los coeficientes ajustados, para poder predecir
+        model = LinearRegression()
+        model.coef_ = coef[b]
+        model.intercept_ = intercepto[b]
+        model.n_features_in_ = lookback
+        
+        t, n = lote.n_train[b], lote.n[b]
+        resultados[nombre] = add_intervals({
+            'model': model,
+            'predictions': {
+                'train': pred[b, :t],
+                'test': pred[b, t:n],
+                'y_train': lote.y[b, :t],
+                'y_test': lote.y[b, t:n],
+                'dates': lote.dates[b]
+            },
+            'metrics': {
+                conjunto: {clave: float(valores[b]) for clave, valores in metricas[conjunto].items()}
+                for conjunto in ('train', 'test')
+            }
+        }, cuantiles[b])
+        
+    return resultados
+
+class ForestBatch:
+    """
+    Árboles de varios Random Forest aplanados en arreglos de NumPy
+    
+    Predice una fila por serie con todos los bosques a la vez: cada par
+    (serie, árbol) baja por su árbol en paralelo, un nivel por iteración,
+    sin llamar a predict. Las hojas apuntan a sí mismas, de modo que los
+    árboles menos profundos simplemente se quedan en su hoja.
+    """
+    
+    def __init__(self, bosques):
+        """
+        Args:
+            bosques: Lista de RandomForestRegressor ajustados, uno por serie
+        """
+        izquierdos, derechos, features, umbrales, valores = [], [], [], [], []
+        raices, series = [], []
+        inicio = 0
+        for b, bosque in enumerate(bosques):
+            for arbol in bosque.estimators_:
+                tree = arbol.tree_
+                nodos = np.arange(tree.node_count)
+                hoja = tree.children_left == -1
+                izquierdos.append(np.where(hoja, nodos, tree.children_left) + inicio)
+                derechos.append(np.where(hoja, nodos, tree.children_right) + inicio)
+                features.append(np.where(hoja, 0, tree.feature))
+                umbrales.append(tree.threshold)
+                valores.append(tree.value[:, 0, 0])
+                raices.append(inicio)
+                series.append(b)
+                inicio += tree.node_count
+                
+        self.izquierdo = np.concatenate(izquierdos)
+        self.derecho = np.concatenate(derechos)
+        self.feature = np.concatenate(features)
+        self.umbral = np.concatenate(umbrales)
+        self.valor = np.concatenate(valores)
+        self.raices = np.array(raices)
+        self.series = np.array(series)
+        self.n_arboles = np.bincount(self.series, minlength=len(bosques))
+        self.profundidad = max(
+            (arbol.tree_.max_depth for bosque in bosques for arbol in bosque.estimators_), default=0
+        )
+        
+    def predict(self, X):
+        """
+        Retorna la predicción de cada bosque para su fila de X
+        
+        Args:
+            X: Features (series, features), una fila por bosque
+        """
+        # Como sklearn: las features se comparan en float32
+        X = np.asarray(X, dtype=np.float32)
+        nodos = self.raices
+        for _ in range(self.profundidad):
+            izquierda = X[self.series, self.feature[nodos]] <= self.umbral[nodos]
+            nodos = np.where(izquierda, self.izquierdo[nodos], self.derecho[nodos])
+        suma = np.bincount(self.series, weights=self.valor[nodos], minlength=len(self.n_arboles))
+        return suma / self.n_arboles
+
+# Modelos de referencia, calculados siempre por lotes
+BASELINES = ['Seasonal Naive', 'Drift', 'Holt-Winters']
+
+# Largo de la temporada de las series mensuales
+PERIODO = 12
+
+# Grilla de suavizamiento de Holt-Winters: (alpha, beta, gamma)
+HW_GRID = np.array([
+    (alpha, beta, gamma)
+    for alpha in (0.1, 0.3, 0.5, 0.7, 0.9)
+    for beta in (0.0, 0.05, 0.2)
+    for gamma in (0.05, 0.2, 0.5)
+])
+
+class SeriesBatch:
+    """
+    Varias series alineadas a la izquierda en una matriz (series, meses)
+    
+    Cada serie se divide como en SARIMA: los primeros n_train valores son
+    de entrenamiento y el resto de prueba.
+    """
+    
+    def __init__(self, series, test_size=0.2, split_idx=None):
+        """
+        Args:
+            series: Diccionario {nombre: Serie temporal}
+            test_size: Proporción de datos de prueba de cada serie
+            split_idx: Valores de entrenamiento de todas las series (si se
+                indica, reemplaza a test_size)
+        """
+        self.nombres = list(series)
+        limpias = [series[nombre].dropna() for nombre in self.nombres]
+        self.dates = [serie.index for serie in limpias]
+        
+        self.n = np.array([len(serie) for serie in limpias], dtype=np.int64)
+        if split_idx is None:
+            self.n_train = (self.n * (1 - test_size)).astype(np.int64)
+        else:
+            self.n_train = np.minimum(self.n, split_idx)
+        
+        n_max = int(self.n.max()) if len(self.n) else 0
+        self.Y = np.zeros((len(limpias), n_max))
+        for b, serie in enumerate(limpias):
+            self.Y[b, :len(serie)] = serie.to_numpy(dtype=np.float64)
+            
+        self.t = np.arange(n_max)
+        
+    def masks(self, arranque):
+        """
+        Retorna las máscaras de entrenamiento y prueba
+        
+        Args:
+            arranque: Filas iniciales de entrenamiento usadas solo para
+                inicializar el modelo (quedan fuera de las métricas)
+        """
+        train = (self.t >= arranque) & (self.t < self.n_train[:, None])
+        test = (self.t >= self.n_train[:, None]) & (self.t < self.n[:, None])
+        return train, test
+
+def seasonal_naive_batch(lote, periodo=PERIODO):
+    """Pronóstico: el valor del mismo mes del último año observado"""
+    T = lote.n_train[:, None]
+    desfasado = np.roll(lote.Y, periodo, axis=1)
+    h = lote.t - T
+    pronostico = np.take_along_axis(lote.Y, np.clip(T - periodo + h % periodo, 0, None), axis=1)
+    return np.where(lote.t < T, desfasado, pronostico)
+
+def drift_batch(lote):
+    """Pronóstico: el último valor más la pendiente promedio de la historia"""
+    T = lote.n_train[:, None]
+    anterior = np.roll(lote.Y, 1, axis=1)
+    pasos = np.maximum(lote.t - 1, 1)
+    ajustado = anterior + (anterior - lote.Y[:, :1]) / pasos
+    
+    ultimo = np.take_along_axis(lote.Y, T - 1, axis=1)
+    pendiente = (ultimo - lote.Y[:, :1]) / np.maximum(T - 1, 1)
+    pronostico = ultimo + (lote.t - T + 1) * pendiente
+    return np.where(lote.t < T, ajustado, pronostico)
+
+def holt_winters_batch(lote, periodo=PERIODO, grid=HW_GRID):
+    """
+    Holt-Winters aditivo, con el suavizamiento elegido por serie en una grilla
+    
+    Las recursiones avanzan mes a mes sobre todas las series y todas las
+    combinaciones de la grilla a la vez; el estado de cada serie se congela
+    al final de su entrenamiento y desde ahí se pronostica.
+    
+    Returns:
+        Tupla (predicciones (series, meses), parámetros elegidos (series, 3))
+    """
+    B, n_max = lote.Y.shape
+    T = lote.n_train
+    alpha, beta, gamma = (grid[:, k][None, :] for k in range(3))
+    
+    # Inicialización con las dos primeras temporadas
+    primera = lote.Y[:, :periodo].mean(axis=1)
+    segunda = lote.Y[:, periodo:2 * periodo].mean(axis=1)
+    nivel = np.repeat(primera[:, None], len(grid), axis=1)
+    tendencia = np.repeat(((segunda - primera) / periodo)[:, None], len(grid), axis=1)
+    estacional = np.repeat((lote.Y[:, :periodo] - primera[:, None])[:, None, :], len(grid), axis=1)
+    
+    ajustado = np.repeat(lote.Y[:, None, :], len(grid), axis=1)
+    for t in range(periodo, int(T.max()) if B else 0):
+        activo = (t < T)[:, None]
+        y = lote.Y[:, t][:, None]
+        s = estacional[:, :, t % periodo]
+        ajustado[:, :, t] = nivel + tendencia + s
+        
+        nuevo_nivel = alpha * (y - s) + (1 - alpha) * (nivel + tendencia)
+        nueva_tendencia = beta * (nuevo_nivel - nivel) + (1 - beta) * tendencia
+        nueva_estacional = gamma * (y - nuevo_nivel) + (1 - gamma) * s
+        
+        nivel = np.where(activo, nuevo_nivel, nivel)
+        tendencia = np.where(activo, nueva_tendencia, tendencia)
+        estacional[:, :, t % periodo] = np.where(activo, nueva_estacional, s)
+        
+    # Elegir, por serie, la combinación con menor error de entrenamiento
+    train, _ = lote.masks(periodo)
+    sse = (np.where(train[:, None, :], lote.Y[:, None, :] - ajustado, 0.0) ** 2).sum(axis=2)
+    mejor = sse.argmin(axis=1)
+    filas = np.arange(B)
+    
+    h = lote.t[None, :] - T[:, None] + 1
+    estacion = estacional[filas, mejor][:, lote.t % periodo]
+    pronostico = nivel[filas, mejor][:, None] + h * tendencia[filas, mejor][:, None] + estacion
+    
+    pred = np.where(lote.t < T[:, None], ajustado[filas, mejor], pronostico)
+    return pred, grid[mejor]
+
+def baselines_batch(series, test_size=0.2, periodo=PERIODO, alpha=MODEL_CONFIG['interval_alpha'],
+                    split_idx=None):
+    """
+    Calcula los modelos de referencia de todas las series en una pasada
+    
+    Las primeras observaciones de entrenamiento (una temporada, o una sola
+    en Drift) solo inicializan el modelo: su predicción es el valor real y no
+    entran en las métricas de entrenamiento.
+    
+    Las bandas de predicción se calibran con los errores de entrenamiento;
+    como la prueba se pronostica a varios pasos, en el paso h se ensanchan
+    por sqrt(h) (sqrt(temporadas transcurridas) en Seasonal Naive).
+    
+    Args:
+        series: Diccionario {nombre: Serie temporal}
+        test_size: Proporción de datos de prueba de cada serie
+        periodo: Largo de la temporada (12 meses)
+        alpha: Nivel de error nominal de las bandas de predicción
+        split_idx: Valores de entrenamiento de todas las series (si se
+            indica, reemplaza a test_size)
+        
+    Returns:
+        Diccionario {nombre: {modelo: resultado}}, con la misma estructura
+        que PredictiveModels.train_sarima
+    """
+    lote = SeriesBatch(series, test_size, split_idx)
+    pred_hw, params_hw = holt_winters_batch(lote, periodo)
+    # Modelo -> (predicciones, filas de arranque, meses por paso del intervalo)
+    calculos = {
+        'Seasonal Naive': (seasonal_naive_batch(lote, periodo), periodo, periodo),
+        'Drift': (drift_batch(lote), 1, 1),
+        'Holt-Winters': (pred_hw, periodo, 1),
+    }
+    
+    resultados = {nombre: {} for nombre in lote.nombres}
+    for model_name, (pred, arranque, meses_paso) in calculos.items():
+        pred = np.where(lote.t < arranque, lote.Y, pred)
+        train, test = lote.masks(arranque)
+        metricas = {
+            'train': batch_metrics(lote.Y, pred, train),
+            'test': batch_metrics(lote.Y, pred, test)
+        }
+        cuantiles = conformal_quantiles(np.where(train, lote.Y - pred, np.nan), alpha)
+        for b, nombre in enumerate(lote.nombres):
+            if model_name == 'Holt-Winters':
+                model = dict(zip(('alpha', 'beta', 'gamma'), params_hw[b].tolist()))
+            else:
+                model = {'periodo': periodo} if model_name == 'Seasonal Naive' else {}
+            t, n = lote.n_train[b], lote.n[b]
+            resultados[nombre][model_name] = add_intervals({
+                'model': model,
+                'predictions': {
+                    'train': pred[b, :t],
+                    'test': pred[b, t:n],
+                    'y_train': lote.Y[b, :t],
+                    'y_test': lote.Y[b, t:n],
+                    'dates': lote.dates[b]
+                },
+                'metrics': {
+                    conjunto: {clave: float(valores[b]) for clave, valores in metricas[conjunto].items()}
+                    for conjunto in ('train', 'test')
+                }
+            }, cuantiles[b], np.sqrt(np.ceil(np.arange(1, n - t + 1) / meses_paso)))
+            
+    return resultados
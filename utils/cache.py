@@ -0,0 +1,144 @@
+"""
+Módulo de caché en disco para los datos preprocesados
+"""
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+def file_fingerprint(archivo, incluir_hash=True):
+    """
+    Retorna la huella de un archivo fuente
+    
+    Args:
+        archivo: Ruta del archivo
+        incluir_hash: Si se calcula el hash SHA-256 del contenido
+    """
+    archivo = Path(archivo)
+    stat = archivo.stat()
+    huella = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns
+    }
+    
+    if incluir_hash:
+        sha = hashlib.sha256()
+        with open(archivo, 'rb') as f:
+            for bloque in iter(lambda: f.read(1 << 20), b''):
+                sha.update(bloque)
+        huella['sha256'] = sha.hexdigest()
+        
+    return huella
+
+class DataCache:
+    """
+    Caché columnar (.npz) de dataframes preprocesados
+    
+    Cada entrada guarda los arreglos de índice, valores y columnas de cada
+    dataframe junto a un archivo .json con la huella (tamaño, mtime y hash)
+    del archivo fuente. Si la huella no coincide, la entrada se ignora.
+    """
+    
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        
+    def _paths(self, nombre):
+        return self.cache_dir / f'{nombre}.npz', self.cache_dir / f'{nombre}.json'
+        
+    def _read_meta(self, nombre):
+        _, meta_path = self._paths(nombre)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+            
+    def _write_meta(self, nombre, meta):
+        _, meta_path = self._paths(nombre)
+        tmp_path = meta_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+        
+    def is_valid(self, nombre, archivo, params=None):
+        """Indica si la entrada corresponde al archivo fuente actual"""
+        meta = self._read_meta(nombre)
+        if meta is None or meta.get('params') != params:
+            return False
+            
+        huella = file_fingerprint(archivo, incluir_hash=False)
+        fuente = meta['source']
+        if huella['size'] != fuente['size']:
+            return False
+        if huella['mtime_ns'] == fuente['mtime_ns']:
+            return True
+            
+        # Mismo tamaño pero mtime distinto: decidir por el contenido
+        huella = file_fingerprint(archivo)
+        if huella['sha256'] != fuente['sha256']:
+            return False
+            
+        meta['source'] = huella
+        self._write_meta(nombre, meta)
+        return True
+        
+    def load(self, nombre, archivo, params=None):
+        """
+        Carga los dataframes guardados si siguen vigentes
+        
+        Returns:
+            Diccionario {clave: DataFrame} o None si no hay entrada válida
+        """
+        data_path, _ = self._paths(nombre)
+        if not data_path.exists() or not self.is_valid(nombre, archivo, params):
+            return None
+            
+        try:
+            with np.load(data_path, allow_pickle=False) as npz:
+                arrays = {key: npz[key] for key in npz.files}
+        except (OSError, ValueError):
+            return None
+            
+        frames = {}
+        for clave in self._read_meta(nombre)['frames']:
+            frames[clave] = pd.DataFrame(
+                arrays[f'{clave}__values'],
+                index=pd.DatetimeIndex(arrays[f'{clave}__index'], name=str(arrays[f'{clave}__index_name'])),
+                columns=arrays[f'{clave}__columns'].tolist()
+            )
+            
+        return frames
+        
+    def save(self, nombre, archivo, frames, params=None):
+        """
+        Guarda los dataframes asociados a un archivo fuente
+        
+        Args:
+            nombre: Nombre de la entrada
+            archivo: Archivo fuente del que provienen los datos
+            frames: Diccionario {clave: DataFrame} con índice de fechas y un
+                solo tipo numérico (se conserva, p. ej. float32)
+            params: Parámetros de carga que también invalidan la entrada
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data_path, _ = self._paths(nombre)
+        
+        arrays = {}
+        for clave, df in frames.items():
+            arrays[f'{clave}__index'] = df.index.values
+            arrays[f'{clave}__index_name'] = np.array(df.index.name or '')
+            arrays[f'{clave}__values'] = df.to_numpy()
+            arrays[f'{clave}__columns'] = np.array([str(col) for col in df.columns])
+            
+        # Escritura atómica: primero los datos, luego la meta que los valida
+        tmp_path = data_path.with_name(data_path.stem + '.tmp.npz')
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, data_path)
+        
+        self._write_meta(nombre, {
+            'source': file_fingerprint(archivo),
+            'params': params,
+            'frames': list(frames)
+        })
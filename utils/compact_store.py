@@ -0,0 +1,125 @@
+"""
+Almacenamiento compacto de todas las series de productos
+"""
+import numpy as np
+import pandas as pd
+
+class CompactSeriesStore:
+    """
+    Series de todos los productos en arreglos float32 con un índice mensual
+    int32 compartido por ambos flujos
+    
+    Los valores de cada flujo se guardan como una matriz (productos, meses),
+    de modo que cada serie es un segmento contiguo. Las consultas entregan
+    float64 para que sumas y promedios no acumulen el redondeo de float32;
+    la conversión se hace en cada consulta y no se conserva, para que el
+    almacén no crezca con las series pedidas.
+    """
+    
+    def __init__(self, meses, productos, valores):
+        """
+        Args:
+            meses: Arreglo int32 de meses desde 1970-01, ordenado
+            productos: Diccionario {flujo: lista de productos}
+            valores: Diccionario {flujo: matriz float32 (productos, meses)}
+        """
+        self.meses = meses
+        self.productos = productos
+        self.valores = valores
+        
+        # Las series se entregan como vistas: el almacén es de solo lectura
+        self.meses.flags.writeable = False
+        for matriz in self.valores.values():
+            matriz.flags.writeable = False
+        self.fechas = pd.DatetimeIndex(meses.astype('datetime64[M]'), name='Fecha')
+        
+        # Rango de meses con datos de cada flujo
+        self.rangos = {}
+        for flujo, matriz in valores.items():
+            con_datos = np.flatnonzero(~np.isnan(matriz).all(axis=0))
+            if len(con_datos):
+                self.rangos[flujo] = (con_datos[0], con_datos[-1] + 1)
+            else:
+                self.rangos[flujo] = (0, 0)
+                
+    @classmethod
+    def from_frames(cls, frames):
+        """
+        Construye el almacén a partir de dataframes indexados por fecha
+        
+        Args:
+            frames: Diccionario {flujo: DataFrame con un producto por columna}
+        """
+        meses_flujo = {
+            flujo: df.index.values.astype('datetime64[M]').astype(np.int32)
+            for flujo, df in frames.items()
+        }
+        meses = np.unique(np.concatenate(list(meses_flujo.values()))).astype(np.int32)
+        
+        productos = {}
+        valores = {}
+        for flujo, df in frames.items():
+            matriz = np.full((df.shape[1], len(meses)), np.nan, dtype=np.float32)
+            matriz[:, np.searchsorted(meses, meses_flujo[flujo])] = df.to_numpy(dtype=np.float32).T
+            productos[flujo] = [str(col) for col in df.columns]
+            valores[flujo] = matriz
+            
+        return cls(meses, productos, valores)
+        
+    def to_frames(self):
+        """Retorna un DataFrame float64 por flujo sobre su rango de meses"""
+        frames = {}
+        for flujo, matriz in self.valores.items():
+            inicio, fin = self.rangos[flujo]
+            frames[flujo] = pd.DataFrame(
+                matriz[:, inicio:fin].T.astype(np.float64),
+                index=self.fechas[inicio:fin],
+                columns=self.productos[flujo]
+            )
+        return frames
+        
+    def get_series(self, flujo, producto):
+        """Retorna la serie de un producto como una copia float64 de solo lectura"""
+        try:
+            j = self.productos[flujo].index(producto)
+        except ValueError:
+            raise KeyError(producto) from None
+            
+        inicio, fin = self.rangos[flujo]
+        valores = self.valores[flujo][j, inicio:fin].astype(np.float64)
+        valores.flags.writeable = False
+        return pd.Series(
+            valores,
+            index=self.fechas[inicio:fin],
+            name=producto,
+            copy=False
+        )
+        
+    def get_frame(self, flujo, productos):
+        """Retorna un DataFrame float64 con algunos productos de un flujo"""
+        inicio, fin = self.rangos[flujo]
+        indices = [self.productos[flujo].index(producto) for producto in productos]
+        return pd.DataFrame(
+            self.valores[flujo][indices, inicio:fin].T.astype(np.float64),
+            index=self.fechas[inicio:fin],
+            columns=list(productos)
+        )
+        
+    def memory_usage(self):
+        """
+        Retorna el uso de memoria en bytes
+        
+        Returns:
+            Diccionario con los bytes de valores, del índice compartido (meses
+            y fechas), el total y el equivalente en float64 con un índice
+            datetime por flujo
+        """
+        valores = sum(matriz.nbytes for matriz in self.valores.values())
+        indice = self.meses.nbytes + self.fechas.nbytes
+        n_celdas = sum(matriz.size for matriz in self.valores.values())
+        return {
+            'valores': valores,
+            'indice': indice,
+            'total': valores + indice,
+            'equivalente_float64': n_celdas * 8 + len(self.valores) * len(self.meses) * 8
+        }
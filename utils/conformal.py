@@ -0,0 +1,67 @@
+"""
+Bandas de predicción empíricas a partir de residuos de calibración
+"""
+import numpy as np
+
+def conformal_quantiles(residuos, alpha=0.1):
+    """
+    Retorna el cuantil empírico del error absoluto de cada serie
+    
+    Con n residuos válidos se toma el error absoluto número
+    ceil((n + 1)(1 - alpha)) en orden creciente, el mismo de la predicción
+    conformal. La cobertura de 1 - alpha solo está garantizada si los
+    residuos no se usaron para ajustar el modelo y son intercambiables con
+    los errores futuros; los modelos calibran con residuos de entrenamiento
+    (u out-of-bag) de series con cambios de nivel, así que las bandas son
+    empíricas y suelen cubrir menos que el nivel nominal. Si hay muy pocos
+    residuos para ese nivel, el cuantil es NaN.
+    
+    Args:
+        residuos: Arreglo (series, n) o (n,); los valores no finitos se ignoran
+        alpha: Nivel de error (0.1 para intervalos de 90%)
+        
+    Returns:
+        Arreglo (series,), o un escalar si residuos es 1D
+    """
+    residuos = np.asarray(residuos, dtype=np.float64)
+    matriz = np.atleast_2d(residuos)
+    if matriz.shape[1] == 0:
+        cuantiles = np.full(len(matriz), np.nan)
+        return cuantiles if residuos.ndim > 1 else cuantiles[0]
+        
+    errores = np.where(np.isfinite(matriz), np.abs(matriz), np.nan)
+    
+    # Los NaN quedan al final de cada fila al ordenar
+    ordenados = np.sort(errores, axis=1)
+    n = np.isfinite(errores).sum(axis=1)
+    k = np.ceil((n + 1) * (1 - alpha)).astype(np.int64)
+    posicion = np.clip(k - 1, 0, max(matriz.shape[1] - 1, 0))
+    cuantiles = np.take_along_axis(ordenados, posicion[:, None], axis=1)[:, 0]
+    cuantiles = np.where((k <= n) & (n > 0), cuantiles, np.nan)
+    
+    return cuantiles if residuos.ndim > 1 else cuantiles[0]
+
+def add_intervals(resultado, cuantil, escala_test=None):
+    """
+    Agrega a las predicciones de un resultado las bandas pred ± cuantil
+    
+    Agrega 'lower_train', 'upper_train', 'lower_test' y 'upper_test' a
+    resultado['predictions'] y guarda el cuantil en resultado['cuantil'].
+    
+    Args:
+        resultado: Resultado de entrenamiento con 'predictions'
+        cuantil: Cuantil empírico del error de un paso
+        escala_test: Factor por período de prueba para predicciones a varios
+            pasos (por defecto 1: la prueba se predice a un paso)
+    """
+    predicciones = resultado['predictions']
+    train = np.asarray(predicciones['train'], dtype=np.float64)
+    test = np.asarray(predicciones['test'], dtype=np.float64)
+    ancho_test = cuantil * (np.ones(len(test)) if escala_test is None else np.asarray(escala_test))
+    
+    predicciones['lower_train'] = train - cuantil
+    predicciones['upper_train'] = train + cuantil
+    predicciones['lower_test'] = test - ancho_test
+    predicciones['upper_test'] = test + ancho_test
+    resultado['cuantil'] = float(cuantil)
+    return resultado
@@ -1,76 +1,290 @@
 """
 Módulo para carga y preprocesamiento de datos
 """
+import datetime
+import hashlib
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from config import CACHE_CONFIG, INGESTION_CONFIG, PRODUCTOS, STORAGE_CONFIG
+from utils.aggregates import AggregateCube
+from utils.cache import DataCache
+from utils.compact_store import CompactSeriesStore
+from utils.excel_reader import detect_data_block, detect_data_blocks, read_sheet_columns
+from utils.frames import read_only_frame, view
+from utils.range_query import SeriesRangeIndex
+from utils.storage import SQLiteBackend, iter_frame_series
+from utils.ingestion import IncrementalIngestor
+
+# Tipo que pandas asigna a las fechas de read_excel (ns en pandas 2, us en pandas 3)
+FECHAS_DTYPE = pd.DatetimeIndex([datetime.datetime(2000, 1, 1)]).dtype
+
+def read_sheet(archivo, sheet_name, engine='pandas', columnas=None, fill_value=None,
+               dtype=np.float64, alias=None, bloque=None):
+    """
+    Lee una hoja del libro de Excel
+    
+    Args:
+        archivo: Ruta del libro
+        sheet_name: Nombre de la hoja
+        engine: 'pandas' o 'streaming'
+        columnas: Columnas a extraer, con 'Fecha' primero (motor 'streaming');
+            None para todas
+        fill_value: Relleno de celdas vacías y columnas ausentes (motor 'streaming')
+        dtype: Tipo de los valores (motor 'streaming')
+        alias: Encabezados alternativos de las columnas (motor 'streaming')
+        bloque: (skiprows, nrows) ya detectado (motor 'pandas'); si es None,
+            se detecta abriendo el libro
+    """
+    if engine == 'streaming':
+        # Solo se extraen las columnas de interés, sin pasar por pandas
+        fechas, valores = read_sheet_columns(
+            archivo,
+            sheet_name,
+            columnas[1:] if columnas is not None else None,
+            dtype=dtype,
+            fill_value=fill_value,
+            alias=alias
+        )
+        df = pd.DataFrame(valores)
+        # Misma unidad que el motor 'pandas', para que ambos den frames idénticos
+        df.insert(0, 'Fecha', fechas.astype(FECHAS_DTYPE))
+        return df
+        
+    # Leer exactamente el bloque de datos, sin encabezados ni notas al pie
+    skiprows, nrows = bloque or detect_data_block(archivo, sheet_name)
+    
+    return pd.read_excel(
+        archivo, 
+        sheet_name=sheet_name, 
+        skiprows=skiprows, 
+        nrows=nrows
+    )
 
 class DataLoader:
     """Clase para cargar y preprocesar los datos de hidrocarburos"""
     
-    def __init__(self, data_path='data'):
+    # Columnas de interés
+    COLUMNAS = ['Fecha'] + PRODUCTOS
+    
+    # Hojas del libro histórico
+    HOJAS = {
+        'importacion': {'sheet_name': 'IMPORTACION'},
+        'consumo': {'sheet_name': 'CONSUMO'},
+    }
+    
+    def __init__(self, data_path='data', use_cache=True, cache_dir=None, engine='pandas',
+                 incremental=True, all_products=False,
+                 backend=None):
+        """
+        Args:
+            data_path: Carpeta con los archivos de datos
+            use_cache: Si se usa la caché en disco de los datos preprocesados
+            cache_dir: Carpeta de la caché (por defecto dentro de data_path)
+            engine: 'pandas' (read_excel) o 'streaming' (openpyxl read_only,
+                solo las columnas de interés)
+            incremental: Si se incorporan los archivos mensuales de importación
+                publicados en data_path
+            all_products: Si se cargan todos los productos en un almacén
+                compacto float32 (siempre con el motor 'streaming')
+            backend: None (consultas en memoria), 'sqlite' o un objeto con la
+                interfaz de SQLiteBackend. Con un backend, las consultas por
+                rango y las agregaciones se resuelven en la base de datos. La
+                base se llena desde los datos ya cargados, que siguen en
+                memoria porque el dashboard los usa
+        """
+        if engine not in ('pandas', 'streaming'):
+            raise ValueError(f"Motor de lectura no soportado: {engine}")
+        
         self.data_path = Path(data_path)
+        self.engine = engine
+        self.incremental = incremental
+        self.all_products = all_products
         self.df_importacion = None
         self.df_consumo = None
+        self.store = None
+        self._cube = None
+        self._combined = None
+        self._rangos = {}
+        
+        if backend == 'sqlite':
+            backend = SQLiteBackend(self.data_path / STORAGE_CONFIG['sqlite_path'])
+        self.backend = backend
+        
+        self.cache = None
+        if use_cache:
+            self.cache = DataCache(cache_dir or self.data_path / CACHE_CONFIG['dir'])
         
     def load_data(self):
         """Carga los datos de importación y consumo"""
         archivo = self.data_path / "Estadisticas_historicas_comercializacion.xlsx"
+        params = {'columnas': self.COLUMNAS, 'todos': self.all_products}
+        nombre = CACHE_CONFIG['nombre'] + ('_todos' if self.all_products else '')
         
-        # Cargar importación
-        self.df_importacion = pd.read_excel(
-            archivo, 
-            sheet_name="IMPORTACION", 
-            skiprows=6, 
-            nrows=289
-        )
+        # Invalidar las agregaciones de la carga anterior
+        self._cube = None
+        self._combined = None
+        self._rangos = {}
+        
+        # Intentar la caché antes de leer el Excel
+        frames = None
+        if self.cache is not None:
+            frames = self.cache.load(nombre, archivo, params)
         
-        # Cargar consumo
-        self.df_consumo = pd.read_excel(
-            archivo, 
-            sheet_name="CONSUMO", 
-            skiprows=6, 
-            nrows=301
+        if frames is not None:
+            self.df_importacion = frames['importacion']
+            self.df_consumo = frames['consumo']
+        else:
+            # Cargar hojas
+            hojas = self._read_sheets({
+                clave: {'archivo': archivo, **spec} for clave, spec in self.HOJAS.items()
+            })
+            self.df_importacion = hojas['importacion']
+            self.df_consumo = hojas['consumo']
+        
+            # Preprocesar
+            self._preprocess()
+        
+            if self.cache is not None:
+                self.cache.save(
+                    nombre,
+                    archivo,
+                    {'importacion': self.df_importacion, 'consumo': self.df_consumo},
+                    params
+                )
+                
+        # Incorporar publicaciones mensuales posteriores al histórico
+        if self.incremental:
+            self._merge_releases()
+            
+        if self.all_products:
+            # Todas las series quedan en el almacén compacto; los dataframes
+            # conservan solo los productos del dashboard
+            self.store = CompactSeriesStore.from_frames(
+                {'importacion': self.df_importacion, 'consumo': self.df_consumo}
+            )
+            self.df_importacion = self.store.get_frame('importacion', PRODUCTOS).dropna()
+            self.df_consumo = self.store.get_frame('consumo', PRODUCTOS).dropna()
+        
+        # Los datos cargados son compartidos: se congelan y se entregan vistas
+        self.df_importacion = read_only_frame(self.df_importacion)
+        self.df_consumo = read_only_frame(self.df_consumo)
+        
+        # Sincronizar el backend solo si cambió la versión de los datos
+        if self.backend is not None:
+            # Las series se recorren una a una desde los datos ya cargados,
+            # sin armar dataframes float64 con todos los productos
+            version = self._data_version(self._iter_series())
+            if not self.backend.is_current(version):
+                self.backend.write_series(self._iter_series(), version)
+        
+        return view(self.df_importacion), view(self.df_consumo)
+        
+    def _merge_releases(self):
+        """Agrega a la importación las filas de los archivos mensuales"""
+        columnas = ['Fecha'] + list(self.df_importacion.columns)
+        nombre = INGESTION_CONFIG['nombre'] + ('_todos' if self.all_products else '')
+        ingestor = IncrementalIngestor(
+            self.data_path,
+            self.data_path / INGESTION_CONFIG['dir'],
+            INGESTION_CONFIG['patron'],
+            nombre,
+            columnas
         )
+        pendientes = ingestor.pending_files()
+        
+        if pendientes:
+            # Solo se leen los archivos nuevos. Las publicaciones omiten los
+            # productos sin movimiento, por lo que las ausencias valen 0
+            hojas = self._read_sheets({
+                str(archivo): {
+                    'archivo': archivo,
+                    'sheet_name': INGESTION_CONFIG['hoja'],
+                    'engine': 'streaming',
+                    'columnas': columnas,
+                    'fill_value': 0.0,
+                    'alias': INGESTION_CONFIG['alias']
+                }
+                for archivo in pendientes
+            })
+            df_mensual = ingestor.append(
+                {archivo: self._clean(df) for archivo, df in hojas.items()}
+            )
+        else:
+            df_mensual = ingestor.load()
+            
+        if df_mensual is not None:
+            df_mensual = df_mensual.astype(self.df_importacion.dtypes)
+            df_mensual.index = df_mensual.index.astype(self.df_importacion.index.dtype)
+            df = pd.concat([self.df_importacion, df_mensual])
+            # Las publicaciones mensuales prevalecen sobre el histórico
+            self.df_importacion = df[~df.index.duplicated(keep='last')].sort_index()
+    
+    def _read_sheets(self, tareas):
+        """
+        Lee varias hojas independientes
+        
+        Args:
+            tareas: Diccionario {clave: kwargs de read_sheet}
+            
+        Returns:
+            Diccionario {clave: DataFrame} en el mismo orden de las tareas
+        """
+        opciones = {'engine': self.engine, 'columnas': self.COLUMNAS}
+        if self.all_products:
+            opciones = {'engine': 'streaming', 'columnas': None, 'dtype': np.float32}
+        tareas = {clave: {**opciones, **kwargs} for clave, kwargs in tareas.items()}
         
-        # Preprocesar
-        self._preprocess()
+        # Los bloques de datos se detectan abriendo cada libro una sola vez,
+        # en lugar de una vez por hoja
+        por_libro = {}
+        for kwargs in tareas.values():
+            if kwargs['engine'] == 'pandas':
+                por_libro.setdefault(kwargs['archivo'], []).append(kwargs['sheet_name'])
+        for archivo, hojas in por_libro.items():
+            bloques = detect_data_blocks(archivo, hojas)
+            for kwargs in tareas.values():
+                if kwargs['engine'] == 'pandas' and kwargs['archivo'] == archivo:
+                    kwargs['bloque'] = bloques[kwargs['sheet_name']]
         
-        return self.df_importacion, self.df_consumo
+        # Se leen en serie: con dos hojas pequeñas, un pool de procesos
+        # costaba más de lo que ganaba
+        return {clave: read_sheet(**kwargs) for clave, kwargs in tareas.items()}
     
     def _preprocess(self):
         """Preprocesamiento de los dataframes"""
-        # Seleccionar columnas de interés
-        cols_interes = ['Fecha', 'Gasolina regular', 'Gasolina superior', 'Diesel alto azufre']
+        self.df_importacion = self._clean(self.df_importacion)
+        self.df_consumo = self._clean(self.df_consumo)
         
-        self.df_importacion = self.df_importacion[cols_interes].copy()
-        self.df_consumo = self.df_consumo[cols_interes].copy()
+    def _clean(self, df):
+        """Preprocesa un dataframe leído de una hoja"""
+        # Seleccionar columnas de interés
+        df = df[self.COLUMNAS].copy() if not self.all_products else df.copy()
         
         # Convertir fecha a datetime
-        self.df_importacion['Fecha'] = pd.to_datetime(self.df_importacion['Fecha'])
-        self.df_consumo['Fecha'] = pd.to_datetime(self.df_consumo['Fecha'])
+        df['Fecha'] = pd.to_datetime(df['Fecha'])
         
-        # Establecer fecha como índice
-        self.df_importacion.set_index('Fecha', inplace=True)
-        self.df_consumo.set_index('Fecha', inplace=True)
+        # Establecer fecha como índice (ordenado, para las consultas por rango)
+        df.set_index('Fecha', inplace=True)
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
         
-        # Eliminar valores NaN
-        self.df_importacion = self.df_importacion.dropna()
-        self.df_consumo = self.df_consumo.dropna()
+        # Eliminar valores NaN (con todos los productos, solo filas vacías)
+        return df.dropna() if not self.all_products else df.dropna(how='all')
     
     def get_combined_data(self):
         """Combina los datos de importación y consumo con prefijos"""
-        df_imp = self.df_importacion.copy()
-        df_cons = self.df_consumo.copy()
+        if self._combined is None:
+            # Renombrar columnas con prefijos (sin copiar los datos)
+            df_imp = view(self.df_importacion)
+            df_cons = view(self.df_consumo)
+            df_imp.columns = [f'Importación {col}' for col in df_imp.columns]
+            df_cons.columns = [f'Consumo {col}' for col in df_cons.columns]
         
-        # Renombrar columnas con prefijos
-        df_imp.columns = [f'Importación {col}' for col in df_imp.columns]
-        df_cons.columns = [f'Consumo {col}' for col in df_cons.columns]
+            # Combinar en el índice común (una sola vez por carga)
+            self._combined = read_only_frame(df_imp.join(df_cons, how='outer'))
         
-        # Combinar en el índice común
-        df_combined = df_imp.join(df_cons, how='outer')
-        
-        return df_combined
+        return view(self._combined)
     
     def get_statistics(self):
         """Retorna estadísticas descriptivas de los datos"""
@@ -102,49 +316,147 @@ class DataLoader:
         Retorna datos para un producto específico
         
         Args:
-            producto: Nombre del producto
+            producto: Nombre del producto (cualquiera con all_products=True)
             tipo: 'importacion', 'consumo', o 'ambos'
         """
         result = {}
         
         if tipo in ['importacion', 'ambos']:
-            result['importacion'] = self.df_importacion[producto]
+            result['importacion'] = self._get_series('importacion', producto)
         
         if tipo in ['consumo', 'ambos']:
-            result['consumo'] = self.df_consumo[producto]
+            result['consumo'] = self._get_series('consumo', producto)
         
         return result
-    
-    def get_yearly_aggregation(self):
-        """Retorna agregación anual de los datos"""
-        # Importación
-        df_imp_yearly = self.df_importacion.copy()
-        df_imp_yearly['Año'] = df_imp_yearly.index.year
-        imp_yearly = df_imp_yearly.groupby('Año').sum()
         
-        # Consumo
-        df_cons_yearly = self.df_consumo.copy()
-        df_cons_yearly['Año'] = df_cons_yearly.index.year
-        cons_yearly = df_cons_yearly.groupby('Año').sum()
+    def _get_series(self, flujo, producto):
+        """Retorna una serie desde el almacén compacto o desde los dataframes"""
+        if self.store is not None:
+            return self.store.get_series(flujo, producto)
+        df = self.df_importacion if flujo == 'importacion' else self.df_consumo
+        return view(df[producto])
         
-        return {
-            'importacion': imp_yearly,
-            'consumo': cons_yearly
+    def _series_frames(self):
+        """Retorna un DataFrame por flujo con todas las series cargadas"""
+        if self.store is not None:
+            return self.store.to_frames()
+        return {'importacion': self.df_importacion, 'consumo': self.df_consumo}
+        
+    def _iter_series(self):
+        """Recorre (flujo, producto, fechas, valores) de todas las series cargadas"""
+        if self.store is None:
+            yield from iter_frame_series(
+                {'importacion': self.df_importacion, 'consumo': self.df_consumo}
+            )
+            return
+            
+        # Filas del almacén compacto, como vistas float32
+        for flujo, productos in self.store.productos.items():
+            inicio, fin = self.store.rangos[flujo]
+            fechas = self.store.fechas.values[inicio:fin]
+            for j, producto in enumerate(productos):
+                yield flujo, producto, fechas, self.store.valores[flujo][j, inicio:fin]
+                
+    @staticmethod
+    def _data_version(series):
+        """
+        Calcula un identificador de versión a partir del contenido de los datos
+        
+        Args:
+            series: Iterable de (flujo, producto, fechas, valores)
+        """
+        sha = hashlib.sha256()
+        for flujo, producto, fechas, valores in series:
+            sha.update(f'{flujo}|{producto}'.encode())
+            sha.update(fechas.astype('datetime64[ns]').tobytes())
+            sha.update(valores.astype(np.float64).tobytes())
+        return sha.hexdigest()
+        
+    def get_range_index(self, producto, tipo):
+        """Retorna el índice de rangos de una serie, construido una vez por carga"""
+        clave = (tipo, producto)
+        if clave not in self._rangos:
+            self._rangos[clave] = SeriesRangeIndex(self._get_series(tipo, producto))
+        return self._rangos[clave]
+        
+    def query(self, producto, tipo, inicio=None, fin=None):
+        """
+        Retorna la serie de un producto entre dos fechas (inclusive)
+        
+        Args:
+            producto: Nombre del producto
+            tipo: 'importacion' o 'consumo'
+            inicio: Fecha inicial (None para el inicio de la serie)
+            fin: Fecha final (None para el final de la serie)
+        """
+        if self.backend is not None:
+            return self.backend.query(tipo, producto, inicio, fin)
+        return view(self.get_range_index(producto, tipo).slice(inicio, fin))
+        
+    def get_range_total(self, producto, tipo, inicio=None, fin=None):
+        """Retorna el total de un producto entre dos fechas en O(log n)"""
+        if self.backend is not None:
+            return self.backend.range_stats(tipo, producto, inicio, fin)[0]
+        return self.get_range_index(producto, tipo).total(inicio, fin)
+        
+    def get_range_mean(self, producto, tipo, inicio=None, fin=None):
+        """Retorna el promedio de un producto entre dos fechas en O(log n)"""
+        if self.backend is not None:
+            total, n = self.backend.range_stats(tipo, producto, inicio, fin)
+            return total / n if n else np.nan
+        return self.get_range_index(producto, tipo).mean(inicio, fin)
+        
+    def get_products(self, tipo='importacion'):
+        """Retorna los productos disponibles para 'importacion' o 'consumo'"""
+        if self.store is not None:
+            return list(self.store.productos[tipo])
+        df = self.df_importacion if tipo == 'importacion' else self.df_consumo
+        return df.columns.tolist()
+        
+    def get_memory_usage(self):
+        """Retorna el uso de memoria (bytes) de los datos cargados"""
+        uso = {
+            'dataframes': int(
+                self.df_importacion.memory_usage(deep=True).sum()
+                + self.df_consumo.memory_usage(deep=True).sum()
+            )
         }
+        if self.store is not None:
+            uso['almacen'] = self.store.memory_usage()
+        return uso
     
-    def get_monthly_patterns(self):
-        """Retorna patrones mensuales promedio"""
-        # Importación
-        df_imp_monthly = self.df_importacion.copy()
-        df_imp_monthly['Mes'] = df_imp_monthly.index.month
-        imp_monthly = df_imp_monthly.groupby('Mes').mean()
+    def get_aggregate_cube(self):
+        """Retorna el cubo de agregaciones, construido una vez por carga de datos"""
+        if self._cube is None:
+            self._cube = AggregateCube(self._series_frames())
+        return self._cube
         
-        # Consumo
-        df_cons_monthly = self.df_consumo.copy()
-        df_cons_monthly['Mes'] = df_cons_monthly.index.month
-        cons_monthly = df_cons_monthly.groupby('Mes').mean()
+    def get_aggregation(self, nivel, estadistica, productos=None):
+        """
+        Retorna una agregación precalculada de ambos flujos
         
+        Args:
+            nivel: 'anual', 'trimestral', 'mensual' (mes del año) o 'anio_mes'
+            estadistica: 'sum', 'mean', 'min', 'max' o 'count'
+            productos: Productos a incluir (por defecto, los del dashboard)
+        """
+        if self.backend is not None:
+            return {
+                tipo: self.backend.aggregate(tipo, nivel, estadistica, productos or PRODUCTOS)
+                for tipo in ('importacion', 'consumo')
+            }
+            
+        cube = self.get_aggregate_cube()
         return {
-            'importacion': imp_monthly,
-            'consumo': cons_monthly
+            'importacion': view(cube.get('importacion', nivel, estadistica, productos or PRODUCTOS)),
+            'consumo': view(cube.get('consumo', nivel, estadistica, productos or PRODUCTOS))
         }
+        
+    def get_yearly_aggregation(self):
+        """Retorna agregación anual de los datos"""
+        return self.get_aggregation('anual', 'sum')
+    
+    def get_monthly_patterns(self):
+        """Retorna patrones mensuales promedio"""
+        return self.get_aggregation('mensual', 'mean')
+        
\ No newline at end of file
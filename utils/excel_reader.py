@@ -0,0 +1,155 @@
+"""
+Lectura en streaming de hojas de Excel con openpyxl (modo read_only)
+"""
+import datetime as dt
+import numpy as np
+from openpyxl import load_workbook
+
+def _normalize(nombre):
+    """Normaliza un encabezado para compararlo con los nombres pedidos"""
+    return _display(nombre).casefold()
+
+def _display(nombre):
+    """Limpia espacios y saltos de línea de un encabezado"""
+    return ' '.join(str(nombre).split()) if nombre is not None else ''
+
+def _to_float(valor, vacio=np.nan):
+    """Convierte una celda a float, usando `vacio` para vacíos y texto"""
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor)
+    return vacio
+
+def _is_date(valor):
+    """Indica si una celda contiene una fecha"""
+    return isinstance(valor, (dt.datetime, dt.date))
+
+def find_header_row(rows, header='Fecha'):
+    """
+    Busca la fila de encabezados recorriendo las filas de una hoja
+    
+    Args:
+        rows: Iterador de filas (tuplas de valores)
+        header: Texto esperado en la primera celda de la fila de encabezados
+        
+    Returns:
+        Tupla (índice de la fila, valores de la fila)
+    """
+    for i, row in enumerate(rows):
+        if row and _normalize(row[0]) == _normalize(header):
+            return i, row
+    raise ValueError(f"No se encontró la fila de encabezados '{header}'")
+
+def detect_data_block(archivo, sheet_name, header='Fecha'):
+    """
+    Detecta el bloque de datos de una hoja leyendo solo la primera columna
+    
+    El bloque empieza en la fila de encabezados (`header`) y termina en la
+    última fila consecutiva con fecha, antes de las notas al pie.
+    
+    Args:
+        archivo: Ruta del libro de Excel
+        sheet_name: Nombre de la hoja
+        header: Texto de la primera celda de la fila de encabezados
+        
+    Returns:
+        Tupla (filas a omitir antes del encabezado, filas de datos)
+    """
+    return detect_data_blocks(archivo, [sheet_name], header)[sheet_name]
+
+def detect_data_blocks(archivo, sheet_names, header='Fecha'):
+    """
+    Detecta el bloque de datos de varias hojas abriendo el libro una sola vez
+    
+    Returns:
+        Diccionario {hoja: (filas a omitir antes del encabezado, filas de datos)}
+    """
+    bloques = {}
+    wb = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        for sheet_name in sheet_names:
+            rows = wb[sheet_name].iter_rows(min_col=1, max_col=1, values_only=True)
+            header_idx, _ = find_header_row(rows, header)
+            
+            n = 0
+            for (fecha,) in rows:
+                if not _is_date(fecha):
+                    break
+                n += 1
+            bloques[sheet_name] = (header_idx, n)
+    finally:
+        wb.close()
+        
+    return bloques
+
+def read_sheet_columns(archivo, sheet_name, columnas=None, header='Fecha', dtype=np.float64,
+                       fill_value=None, alias=None):
+    """
+    Lee solo las columnas pedidas de una hoja, fila por fila
+    
+    La hoja se recorre en modo read_only, de modo que nunca se carga completa
+    en memoria: solo se conservan las celdas de las columnas proyectadas, que
+    se escriben directamente en arreglos de NumPy ya tipados.
+    
+    Args:
+        archivo: Ruta del libro de Excel
+        sheet_name: Nombre de la hoja
+        columnas: Columnas de valores a extraer (sin la de fechas). Si es None,
+            se extraen todas las columnas con encabezado
+        header: Encabezado de la columna de fechas
+        dtype: Tipo de los arreglos de valores
+        fill_value: Valor para celdas vacías y columnas ausentes. Si es None,
+            las celdas vacías quedan como NaN y una columna ausente es un error
+        alias: Diccionario {encabezado en la hoja: nombre de columna} para
+            encabezados que cambian entre publicaciones
+        
+    Returns:
+        Tupla (fechas datetime64[ns], {columna: arreglo de valores})
+    """
+    wb = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name]
+        rows = ws.iter_rows(values_only=True)
+        header_idx, header_row = find_header_row(rows, header)
+        
+        # Proyección: posición de cada columna pedida en la fila de encabezados
+        alias = {_normalize(k): v for k, v in (alias or {}).items()}
+        nombres = [alias.get(_normalize(nombre), nombre) for nombre in header_row]
+        if columnas is None:
+            columnas = [_display(nombre) for nombre in nombres[1:] if _display(nombre)]
+        posiciones = {_normalize(nombre): i for i, nombre in enumerate(nombres)}
+        faltantes = [col for col in columnas if _normalize(col) not in posiciones]
+        if faltantes and fill_value is None:
+            raise KeyError(f"Columnas no encontradas en '{sheet_name}': {faltantes}")
+        indices = [posiciones.get(_normalize(col)) for col in columnas]
+        vacio = np.nan if fill_value is None else fill_value
+        
+        # Reservar según la dimensión declarada de la hoja (si existe)
+        capacidad = max((ws.max_row or 0) - header_idx - 1, 16)
+        fechas = np.empty(capacidad, dtype='datetime64[ns]')
+        valores = np.empty((len(columnas), capacidad), dtype=dtype)
+        
+        n = 0
+        for row in rows:
+            fecha = row[0] if row else None
+            # El bloque de datos termina en la primera fila sin fecha
+            if not _is_date(fecha):
+                break
+                
+            if n == capacidad:
+                capacidad *= 2
+                fechas = np.resize(fechas, capacidad)
+                crecido = np.empty((len(columnas), capacidad), dtype=dtype)
+                crecido[:, :n] = valores[:, :n]
+                valores = crecido
+                
+            fechas[n] = np.datetime64(fecha, 'ns')
+            for j, idx in enumerate(indices):
+                if idx is None or idx >= len(row):
+                    valores[j, n] = vacio
+                else:
+                    valores[j, n] = _to_float(row[idx], vacio)
+            n += 1
+    finally:
+        wb.close()
+        
+    return fechas[:n], {col: valores[j, :n] for j, col in enumerate(columnas)}
@@ -0,0 +1,34 @@
+"""
+Construcción de features y huellas de series temporales
+"""
+import hashlib
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+def lag_matrix(valores, lookback):
+    """
+    Construye la matriz de rezagos de una serie sin bucles de Python
+    
+    La fila k de X contiene valores[k:k+lookback] y su objetivo es
+    valores[k+lookback]. X es una vista (stride tricks) del arreglo
+    contiguo de la serie, de solo lectura y sin copias. Una serie de
+    `lookback` valores o menos no tiene ventanas: X es (0, lookback) e y
+    está vacío.
+    
+    Args:
+        valores: Arreglo 1D con la serie
+        lookback: Número de períodos anteriores a usar como features
+    """
+    valores = np.ascontiguousarray(valores, dtype=np.float64)
+    if len(valores) <= lookback:
+        return np.empty((0, lookback)), np.empty(0)
+    X = sliding_window_view(valores, lookback)[:-1]
+    y = valores[lookback:]
+    return X, y
+
+def series_key(serie):
+    """Retorna una huella del contenido (fechas y valores) de una serie"""
+    sha = hashlib.sha1()
+    sha.update(np.ascontiguousarray(serie.index.values).tobytes())
+    sha.update(np.ascontiguousarray(serie.to_numpy(dtype=np.float64)).tobytes())
+    return sha.hexdigest()
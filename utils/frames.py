@@ -0,0 +1,24 @@
+"""
+Utilidades para compartir dataframes sin copias y sin mutaciones
+"""
+import pandas as pd
+
+def read_only_frame(df):
+    """
+    Retorna un DataFrame homogéneo respaldado por un único arreglo de solo lectura
+    
+    Se copia una sola vez al construirlo; cualquier escritura posterior sobre
+    los valores lanza ValueError en lugar de alterar el estado compartido.
+    """
+    valores = df.to_numpy(copy=True)
+    valores.flags.writeable = False
+    return pd.DataFrame(valores, index=df.index, columns=df.columns, copy=False)
+
+def view(obj):
+    """
+    Retorna una vista sin copia de datos de un DataFrame o Serie compartido
+    
+    La vista comparte los arreglos de solo lectura del original, pero es un
+    objeto distinto: agregar columnas o renombrarla no afecta al original.
+    """
+    return obj.copy(deep=False)
@@ -0,0 +1,106 @@
+"""
+Datos apilados de varias series para entrenar un único modelo global
+"""
+import numpy as np
+from utils.features import lag_matrix
+
+def month_features(fechas):
+    """Retorna el mes de cada fecha como (seno, coseno), una fila por fecha"""
+    mes = 2 * np.pi * (np.asarray(fechas.month) - 1) / 12
+    return np.column_stack([np.sin(mes), np.cos(mes)])
+
+class GlobalDataset:
+    """
+    Ventanas de rezagos de todas las series apiladas en una sola matriz
+    
+    Cada serie se estandariza con la media y la desviación de su tramo de
+    entrenamiento, de modo que series de distinta magnitud comparten el
+    modelo. A los rezagos se agregan la identidad de la serie (one-hot) y
+    el mes del objetivo (seno y coseno). La división train/test de cada
+    serie es la misma que usa prepare_data.
+    """
+    
+    def __init__(self, series, lookback=12, test_size=0.2):
+        """
+        Args:
+            series: Diccionario {nombre: Serie temporal}
+            lookback: Número de períodos anteriores a usar como features
+            test_size: Proporción de datos de prueba de cada serie
+        """
+        self.nombres = list(series)
+        self.lookback = lookback
+        self.dates = []
+        self.filas = []
+        self.n_train = []
+        
+        n_series = len(self.nombres)
+        self.medias = np.empty(n_series)
+        self.desviaciones = np.empty(n_series)
+        medias, desviaciones = [], []
+        bloques_X, bloques_y = [], []
+        inicio = 0
+        for b, nombre in enumerate(self.nombres):
+            serie = series[nombre].dropna()
+            valores = serie.to_numpy(dtype=np.float64)
+            n = max(len(valores) - lookback, 0)
+            n_train = int(n * (1 - test_size))
+            
+            # Escala del tramo visto en entrenamiento (rezagos y objetivos)
+            tramo = valores[:lookback + n_train]
+            media = tramo.mean()
+            desviacion = tramo.std()
+            if not desviacion > 0:
+                desviacion = 1.0
+                
+            X, y = lag_matrix((valores - media) / desviacion, lookback)
+            fechas = serie.index[lookback:]
+            identidad = np.zeros((n, n_series))
+            identidad[:, b] = 1.0
+            
+            bloques_X.append(np.hstack([X, identidad, month_features(fechas)]))
+            bloques_y.append(y)
+            self.medias[b] = media
+            self.desviaciones[b] = desviacion
+            medias.append(np.full(n, media))
+            desviaciones.append(np.full(n, desviacion))
+            self.dates.append(fechas)
+            self.filas.append(slice(inicio, inicio + n))
+            self.n_train.append(n_train)
+            inicio += n
+            
+        self.X = np.vstack(bloques_X) if bloques_X else np.empty((0, lookback + n_series + 2))
+        self.y = np.concatenate(bloques_y) if bloques_y else np.empty(0)
+        self._media = np.concatenate(medias) if medias else np.empty(0)
+        self._desviacion = np.concatenate(desviaciones) if desviaciones else np.empty(0)
+        
+        self.train_mask = np.zeros(len(self.y), dtype=bool)
+        for filas, n_train in zip(self.filas, self.n_train):
+            self.train_mask[filas.start:filas.start + n_train] = True
+            
+    def features(self, ventanas, fechas):
+        """
+        Construye una fila de X por serie a partir de sus últimos valores
+        
+        Args:
+            ventanas: Últimos `lookback` valores de cada serie, en la escala
+                original (series, lookback)
+            fechas: Fecha objetivo de cada serie
+        """
+        estandarizadas = (ventanas - self.medias[:, None]) / self.desviaciones[:, None]
+        return np.hstack([estandarizadas, np.eye(len(self.nombres)), month_features(fechas)])
+            
+    def unscale(self, valores):
+        """Lleva valores estandarizados (una fila por fila de X) a la escala original"""
+        return valores * self._desviacion + self._media
+        
+    def split(self, valores):
+        """
+        Separa un arreglo alineado con las filas de X por serie
+        
+        Returns:
+            Diccionario {nombre: (tramo de entrenamiento, tramo de prueba)}
+        """
+        return {
+            nombre: (valores[filas][:n_train], valores[filas][n_train:])
+            for nombre, filas, n_train in zip(self.nombres, self.filas, self.n_train)
+        }
@@ -0,0 +1,155 @@
+"""
+Ingesta incremental de los archivos mensuales publicados en la carpeta de datos
+"""
+import json
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from utils.cache import file_fingerprint
+
+# Versión del formato del almacén; uno anterior se reconstruye desde los archivos
+FORMATO = 2
+
+class IncrementalIngestor:
+    """
+    Mantiene un almacén persistente con las filas de los archivos mensuales
+    
+    El manifiesto registra la huella de cada archivo ya incorporado, de modo
+    que una actualización solo lee los archivos nuevos (o republicados) y
+    agrega sus filas al almacén, sin volver a procesar el histórico. Cada
+    fila guarda la publicación de la que viene: si dos publicaciones traen
+    el mismo mes, prevalece la más reciente (por nombre, AAAA-MM), aunque
+    la más antigua se haya republicado después.
+    """
+    
+    def __init__(self, data_path, store_dir, patron, nombre, columnas):
+        """
+        Args:
+            data_path: Carpeta donde se publican los archivos mensuales
+            store_dir: Carpeta del almacén persistente
+            patron: Patrón glob de los archivos mensuales
+            nombre: Nombre del almacén (una serie de archivos por flujo)
+            columnas: Columnas almacenadas; si cambian, el almacén se reconstruye
+        """
+        self.data_path = Path(data_path)
+        self.store_dir = Path(store_dir)
+        self.patron = patron
+        self.nombre = nombre
+        self.columnas = list(columnas)
+        
+    @property
+    def _store_path(self):
+        return self.store_dir / f'{self.nombre}.npz'
+        
+    @property
+    def _manifest_path(self):
+        return self.store_dir / f'{self.nombre}.json'
+        
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+            
+        if (manifest is None or manifest.get('columnas') != self.columnas
+                or manifest.get('formato') != FORMATO):
+            return {'formato': FORMATO, 'columnas': self.columnas, 'archivos': {}}
+        return manifest
+        
+    def _write_manifest(self, manifest):
+        tmp_path = self._manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self._manifest_path)
+        
+    def pending_files(self):
+        """Retorna los archivos mensuales que aún no están en el almacén"""
+        registrados = self._read_manifest()['archivos']
+        pendientes = []
+        
+        # El nombre incluye AAAA-MM, así que el orden alfabético es cronológico
+        for archivo in sorted(self.data_path.glob(self.patron)):
+            previo = registrados.get(archivo.name)
+            if previo is None:
+                pendientes.append(archivo)
+                continue
+                
+            huella = file_fingerprint(archivo, incluir_hash=False)
+            if (huella['size'], huella['mtime_ns']) == (previo['size'], previo['mtime_ns']):
+                continue
+            if file_fingerprint(archivo)['sha256'] != previo['sha256']:
+                pendientes.append(archivo)
+                
+        return pendientes
+        
+    def load(self):
+        """Carga las filas almacenadas (DataFrame indexado por fecha) o None"""
+        almacenado = self._load_rows()
+        return almacenado[0] if almacenado is not None else None
+        
+    def _load_rows(self):
+        """Retorna (filas almacenadas, publicación de cada fila) o None"""
+        if not self._store_path.exists() or not self._read_manifest()['archivos']:
+            return None
+            
+        with np.load(self._store_path, allow_pickle=False) as npz:
+            df = pd.DataFrame(
+                npz['values'],
+                index=pd.DatetimeIndex(npz['index'], name='Fecha'),
+                columns=npz['columns'].tolist()
+            )
+            return df, npz['release']
+            
+    def append(self, frames):
+        """
+        Agrega al almacén las filas de archivos recién leídos
+        
+        Args:
+            frames: Diccionario {ruta del archivo: DataFrame preprocesado}
+                
+        Returns:
+            DataFrame con todas las filas almacenadas
+        """
+        almacenado = self._load_rows()
+        df = almacenado[0] if almacenado is not None else None
+        nuevos = {Path(archivo).name: frame for archivo, frame in frames.items() if len(frame)}
+        if nuevos:
+            bloques = [df] if df is not None else []
+            publicaciones = [almacenado[1]] if almacenado is not None else []
+            for nombre, frame in nuevos.items():
+                bloques.append(frame)
+                publicaciones.append(np.full(len(frame), nombre))
+            df = pd.concat(bloques)
+            publicacion = np.concatenate(publicaciones)
+            
+            # Por cada mes prevalece la publicación más reciente; entre filas
+            # de la misma publicación, la recién leída (orden estable)
+            orden = np.argsort(publicacion, kind='stable')
+            df, publicacion = df.iloc[orden], publicacion[orden]
+            vigentes = ~df.index.duplicated(keep='last')
+            df, publicacion = df[vigentes], publicacion[vigentes]
+            orden = np.argsort(df.index.values, kind='stable')
+            df, publicacion = df.iloc[orden], publicacion[orden]
+            
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._store_path.with_name(self.nombre + '.tmp.npz')
+            np.savez(
+                tmp_path,
+                index=df.index.values,
+                values=df.to_numpy(),
+                columns=np.array([str(col) for col in df.columns]),
+                release=publicacion.astype(str)
+            )
+            os.replace(tmp_path, self._store_path)
+            
+        # El manifiesto se escribe al final: si algo falla antes, los
+        # archivos se vuelven a procesar en la siguiente actualización
+        manifest = self._read_manifest()
+        for archivo in frames:
+            manifest['archivos'][Path(archivo).name] = file_fingerprint(archivo)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self._write_manifest(manifest)
+        
+        return df
@@ -0,0 +1,193 @@
+"""
+Selección automática de órdenes SARIMA por AIC/BIC
+"""
+import itertools
+import multiprocessing
+import os
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from utils.features import series_key
+
+# Criterios y parámetros de los candidatos ya ajustados en este proceso:
+# (huella de la serie, order, seasonal_order, maxiter) -> {'aic', 'bic', 'params'}
+# o None. Por encima de MEMO_MAX entradas se desalojan las menos usadas
+MEMO_MAX = 2048
+_MEMO = OrderedDict()
+
+def fit_candidate(valores, order, seasonal_order, maxiter):
+    """
+    Ajusta un candidato y retorna sus criterios de información
+    
+    Es una función de módulo para poder ejecutarse en un pool de procesos.
+    
+    Returns:
+        Diccionario {'aic', 'bic', 'params'}, o None si el ajuste falló
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            fitted = SARIMAX(
+                valores,
+                order=order,
+                seasonal_order=seasonal_order,
+                enforce_stationarity=False,
+                enforce_invertibility=False
+            ).fit(disp=False, maxiter=maxiter)
+        except Exception:
+            return None
+            
+    if not (np.isfinite(fitted.aic) and np.isfinite(fitted.bic)):
+        return None
+    return {'aic': float(fitted.aic), 'bic': float(fitted.bic), 'params': np.asarray(fitted.params)}
+
+class SarimaOrderSearch:
+    """
+    Búsqueda en grilla de (p,d,q)(P,D,Q,s) con poda temprana
+    
+    Todos los candidatos se ajustan primero con pocas iteraciones; solo los
+    que quedan cerca del mejor pasan al ajuste completo, y el ganador es el
+    de menor criterio en esa segunda ronda. Los criterios y parámetros de
+    cada candidato se memoizan por huella de la serie, así que repetir la
+    búsqueda sobre los mismos datos no ajusta ningún modelo.
+    
+    La memoria es del proceso: no se comparte entre los trabajadores de un
+    pool ni sobrevive a un reinicio. Lo que persiste entre ejecuciones es
+    el modelo ganador, en el almacén de artefactos.
+    """
+    
+    def __init__(self, p=(0, 1, 2), d=(1,), q=(0, 1, 2), P=(0, 1), D=(1,), Q=(0, 1),
+                 periodo=12, criterio='aic', maxiter=200, maxiter_poda=5,
+                 margen_poda=10.0, finalistas=4, parallel=True, max_workers=None):
+        """
+        Args:
+            p, d, q: Valores de la grilla para el orden no estacional
+            P, D, Q: Valores de la grilla para el orden estacional
+            periodo: Período estacional
+            criterio: 'aic' o 'bic'
+            maxiter: Iteraciones del ajuste completo
+            maxiter_poda: Iteraciones del ajuste preliminar
+            margen_poda: Se descartan los candidatos cuyo criterio preliminar
+                supera al mejor por más de este margen
+            finalistas: Máximo de candidatos que llegan al ajuste completo
+            parallel: Si los candidatos se ajustan en un pool de procesos
+            max_workers: Número máximo de procesos (por defecto, uno por CPU)
+        """
+        if criterio not in ('aic', 'bic'):
+            raise ValueError(f"Criterio no soportado: {criterio}")
+            
+        self.candidatos = [
+            ((p_, d_, q_), (P_, D_, Q_, periodo))
+            for p_, d_, q_, P_, D_, Q_ in itertools.product(p, d, q, P, D, Q)
+        ]
+        self.criterio = criterio
+        self.maxiter = maxiter
+        self.maxiter_poda = maxiter_poda
+        self.margen_poda = margen_poda
+        self.finalistas = finalistas
+        self.parallel = parallel
+        self.max_workers = max_workers
+        
+    def _evaluate(self, serie, candidatos, maxiter):
+        """
+        Retorna los criterios de cada candidato, ajustando solo los que no
+        están en la memoria
+        """
+        huella = series_key(serie)
+        claves = {candidato: (huella, *candidato, maxiter) for candidato in candidatos}
+        faltantes = [candidato for candidato in candidatos if claves[candidato] not in _MEMO]
+        
+        resultados = {}
+        for candidato in candidatos:
+            if candidato not in faltantes:
+                _MEMO.move_to_end(claves[candidato])
+                resultados[candidato] = _MEMO[claves[candidato]]
+                
+        if faltantes:
+            valores = serie.to_numpy(dtype=np.float64)
+            argumentos = [(valores, order, seasonal_order, maxiter) for order, seasonal_order in faltantes]
+            # Dentro de un trabajador de otro pool (BackgroundTrainer) se
+            # ajusta en serie, para no multiplicar los procesos por CPU
+            max_workers = min(self.max_workers or os.cpu_count() or 1, len(faltantes))
+            anidado = multiprocessing.parent_process() is not None
+            if self.parallel and max_workers > 1 and not anidado:
+                with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                    criterios = list(pool.map(fit_candidate, *zip(*argumentos)))
+            else:
+                criterios = [fit_candidate(*args) for args in argumentos]
+            for candidato, c in zip(faltantes, criterios):
+                _MEMO[claves[candidato]] = c
+                resultados[candidato] = c
+            while len(_MEMO) > MEMO_MAX:
+                _MEMO.popitem(last=False)
+            
+        return {candidato: resultados[candidato] for candidato in candidatos}
+        
+    def select(self, serie):
+        """
+        Retorna el mejor (order, seasonal_order) para una serie
+        
+        Args:
+            serie: Serie de entrenamiento (ya normalizada), sin nulos
+            
+        Returns:
+            Tupla (order, seasonal_order), o None si ningún candidato pudo ajustarse
+        """
+        # Ronda preliminar: pocas iteraciones para descartar los claramente
+        # peores. Casi ningún candidato converge en maxiter_poda iteraciones,
+        # así que la poda se valida contra la búsqueda exhaustiva en todas
+        # las series del dashboard (tests/test_order_search.py)
+        preliminar = {
+            candidato: c[self.criterio]
+            for candidato, c in self._evaluate(serie, self.candidatos, self.maxiter_poda).items()
+            if c is not None
+        }
+        if not preliminar:
+            return None
+        mejor = min(preliminar.values())
+        finalistas = sorted(
+            (candidato for candidato, valor in preliminar.items() if valor <= mejor + self.margen_poda),
+            key=preliminar.get
+        )[:self.finalistas]
+        
+        # Ronda final: ajuste completo de los sobrevivientes
+        final = {
+            candidato: c[self.criterio]
+            for candidato, c in self._evaluate(serie, finalistas, self.maxiter).items()
+            if c is not None
+        }
+        if not final:
+            return None
+        return min(final, key=final.get)
+
+    def fit(self, serie):
+        """
+        Retorna el SARIMAX ganador ajustado sobre la serie
+        
+        No se vuelve a optimizar: el modelo se suaviza con los parámetros
+        del ajuste completo de la ronda final, lo que da el mismo resultado
+        que fit() con las mismas iteraciones.
+        
+        Args:
+            serie: Serie de entrenamiento (ya normalizada), sin nulos
+            
+        Returns:
+            Resultados de SARIMAX, o None si ningún candidato pudo ajustarse
+        """
+        seleccion = self.select(serie)
+        if seleccion is None:
+            return None
+        order, seasonal_order = seleccion
+        params = self._evaluate(serie, [seleccion], self.maxiter)[seleccion]['params']
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            return SARIMAX(
+                serie,
+                order=order,
+                seasonal_order=seasonal_order,
+                enforce_stationarity=False,
+                enforce_invertibility=False
+            ).smooth(params)
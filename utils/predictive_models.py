@@ -1,6 +1,9 @@
 """
 Módulo con modelos predictivos para series de tiempo
 """
+import copy
+import multiprocessing
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import LinearRegression
@@ -8,44 +11,207 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 from sklearn.preprocessing import MinMaxScaler
 from statsmodels.tsa.statespace.sarimax import SARIMAX
+from config import MODEL_CONFIG, SARIMA_SEARCH_CONFIG
+from utils.batch_models import (BASELINES, HW_GRID, PERIODO, ForestBatch, LagBatch,
+                                baselines_batch, fit_linear_batch)
+from utils.conformal import add_intervals, conformal_quantiles
+from utils.features import lag_matrix, series_key
+from utils.global_model import GlobalDataset
+from utils.order_search import SarimaOrderSearch
 import warnings
 warnings.filterwarnings('ignore')
 
+# Modelos disponibles: nombre -> método de entrenamiento
+MODELOS = {
+    'Linear Regression': 'train_linear_regression',
+    'Random Forest': 'train_random_forest',
+    'SARIMA': 'train_sarima',
+    'Seasonal Naive': 'train_baseline',
+    'Drift': 'train_baseline',
+    'Holt-Winters': 'train_baseline',
+}
+
+# Hiperparámetros de cada modelo (forman parte de la clave de sus artefactos)
+HIPERPARAMETROS = {
+    'Linear Regression': {'lookback': 12},
+    # n_estimators es el máximo: el bosque crece de a `paso` árboles hasta
+    # que el R² out-of-bag mejora menos que `tolerancia_oob`
+    'Random Forest': {
+        'lookback': 12, 'n_estimators': 100, 'max_depth': 10,
+        'paso': 20, 'tolerancia_oob': 0.005,
+    },
+    'SARIMA': {
+        'order': MODEL_CONFIG['sarima_order'],
+        'seasonal_order': MODEL_CONFIG['sarima_seasonal_order'],
+        # Con búsqueda, los órdenes anteriores quedan solo como respaldo
+        'busqueda': {
+            clave: valor for clave, valor in SARIMA_SEARCH_CONFIG.items()
+            if clave not in ('enabled', 'parallel', 'max_workers')
+        } if SARIMA_SEARCH_CONFIG['enabled'] else None,
+    },
+    'Seasonal Naive': {'periodo': PERIODO},
+    'Drift': {},
+    'Holt-Winters': {'periodo': PERIODO, 'grid': HW_GRID.tolist()},
+}
+
+# Entradas máximas de las memos de features, pronósticos y ajustes sobre la
+# serie completa de cada instancia; por encima se desalojan las menos usadas
+MEMO_MAX = 64
+
+# Modelos que pueden actualizarse con datos nuevos sin entrenarse desde cero
+ACTUALIZABLES = {
+    'SARIMA': 'update_sarima',
+    'Random Forest': 'update_random_forest',
+}
+
+def future_dates(index, horizon):
+    """
+    Retorna las `horizon` fechas mensuales (inicio de mes) siguientes al
+    mes del final de un índice, aunque esa fecha no sea inicio de mes
+    """
+    siguiente = (index[-1].to_period('M') + 1).to_timestamp()
+    return pd.date_range(siguiente, periods=horizon, freq='MS')
+
+def split_metrics(y_train, y_pred_train, y_test, y_pred_test):
+    """Retorna MSE, MAE y R² de los tramos de entrenamiento y prueba"""
+    return {
+        'train': {
+            'mse': mean_squared_error(y_train, y_pred_train),
+            'mae': mean_absolute_error(y_train, y_pred_train),
+            'r2': r2_score(y_train, y_pred_train)
+        },
+        'test': {
+            'mse': mean_squared_error(y_test, y_pred_test),
+            'mae': mean_absolute_error(y_test, y_pred_test),
+            'r2': r2_score(y_test, y_pred_test)
+        }
+    }
+
+def metrics_table(metricas):
+    """
+    Retorna la tabla comparativa de métricas
+    
+    Args:
+        metricas: Diccionario {modelo: métricas train/test}; los modelos sin
+            métricas (None) se omiten
+    """
+    comparacion = []
+    
+    for model_name, metrics in metricas.items():
+        if metrics is not None:
+            comparacion.append({
+                'Modelo': model_name,
+                'MAE (Train)': metrics['train']['mae'],
+                'MSE (Train)': metrics['train']['mse'],
+                'R² (Train)': metrics['train']['r2'],
+                'MAE (Test)': metrics['test']['mae'],
+                'MSE (Test)': metrics['test']['mse'],
+                'R² (Test)': metrics['test']['r2']
+            })
+            
+    return pd.DataFrame(comparacion)
+
+def compact_result(resultado):
+    """
+    Retorna una versión liviana de un resultado, para guardarlo en disco
+    
+    Los resultados de SARIMAX conservan la serie y las matrices del filtro
+    de Kalman de cada período (decenas de MB); de SARIMA se guardan solo
+    los órdenes y los parámetros, y restore_result reconstruye el modelo.
+    Los demás resultados se retornan sin cambios.
+    """
+    if resultado is None or 'scaler' not in resultado or 'model' not in resultado:
+        return resultado
+    fitted_model = resultado['model']
+    compacto = {clave: valor for clave, valor in resultado.items() if clave != 'model'}
+    compacto['sarima'] = {
+        'order': fitted_model.model.order,
+        'seasonal_order': fitted_model.model.seasonal_order,
+        'params': np.asarray(fitted_model.params),
+    }
+    return compacto
+
+def restore_result(resultado):
+    """
+    Reconstruye el modelo de un resultado guardado con compact_result
+    
+    El SARIMAX se suaviza con los parámetros guardados sobre el tramo de
+    entrenamiento normalizado, sin volver a optimizar.
+    """
+    if resultado is None or 'sarima' not in resultado:
+        return resultado
+    spec = resultado['sarima']
+    predicciones = resultado['predictions']
+    y_train = np.asarray(predicciones['y_train'], dtype=np.float64)
+    train = pd.Series(
+        resultado['scaler'].transform(y_train.reshape(-1, 1)).flatten() * 10,
+        index=predicciones['dates'][:len(y_train)]
+    )
+    fitted_model = SARIMAX(
+        train,
+        order=spec['order'],
+        seasonal_order=spec['seasonal_order'],
+        enforce_stationarity=False,
+        enforce_invertibility=False
+    ).smooth(spec['params'])
+    restaurado = {clave: valor for clave, valor in resultado.items() if clave != 'sarima'}
+    restaurado['model'] = fitted_model
+    return restaurado
+
 class PredictiveModels:
     """Clase para entrenar y evaluar modelos predictivos"""
     
-    def __init__(self, test_size=0.2):
+    def __init__(self, test_size=0.2, random_state=42):
         self.test_size = test_size
+        self.random_state = random_state
         self.models = {}
         self.predictions = {}
         self.metrics = {}
+        self.errors = {}         # modelo -> excepción del último ajuste fallido
         self.scaler = MinMaxScaler()
+        self._features = OrderedDict()
+        self._forecasts = OrderedDict()
+        self._full_fits = OrderedDict()
+        
+        busqueda = HIPERPARAMETROS['SARIMA']['busqueda']
+        self.order_search = SarimaOrderSearch(
+            **busqueda['grid'],
+            criterio=busqueda['criterio'],
+            maxiter_poda=busqueda['maxiter_poda'],
+            margen_poda=busqueda['margen_poda'],
+            finalistas=busqueda['finalistas'],
+            parallel=SARIMA_SEARCH_CONFIG['parallel'],
+            max_workers=SARIMA_SEARCH_CONFIG['max_workers']
+        ) if busqueda is not None else None
         
     def prepare_data(self, serie, lookback=12):
         """
         Prepara los datos para modelos de ML
         
+        El resultado se memoiza por (contenido de la serie, lookback), de modo
+        que Regresión Lineal y Random Forest comparten las mismas matrices.
+        
         Args:
             serie: Serie temporal
             lookback: Número de períodos anteriores a usar como features
         """
         serie = serie.dropna()
+        clave = (series_key(serie), lookback, self.test_size)
+        if clave in self._features:
+            self._features.move_to_end(clave)
+            return self._features[clave]
         
         # Crear features (valores pasados)
-        X, y = [], []
-        for i in range(lookback, len(serie)):
-            X.append(serie.iloc[i-lookback:i].values)
-            y.append(serie.iloc[i])
-        
-        X = np.array(X)
-        y = np.array(y)
+        X, y = lag_matrix(serie.to_numpy(dtype=np.float64), lookback)
         
         # Split train/test
         split_idx = int(len(X) * (1 - self.test_size))
         X_train, X_test = X[:split_idx], X[split_idx:]
         y_train, y_test = y[:split_idx], y[split_idx:]
         
-        return X_train, X_test, y_train, y_test, serie.index[lookback:]
+        datos = (X_train, X_test, y_train, y_test, serie.index[lookback:])
+        self._remember(self._features, clave, datos)
+        return datos
     
     def train_linear_regression(self, serie, lookback=12):
         """Entrena modelo de Regresión Lineal"""
@@ -60,20 +226,9 @@ class PredictiveModels:
         y_pred_test = model.predict(X_test)
         
         # Métricas
-        metrics = {
-            'train': {
-                'mse': mean_squared_error(y_train, y_pred_train),
-                'mae': mean_absolute_error(y_train, y_pred_train),
-                'r2': r2_score(y_train, y_pred_train)
-            },
-            'test': {
-                'mse': mean_squared_error(y_test, y_pred_test),
-                'mae': mean_absolute_error(y_test, y_pred_test),
-                'r2': r2_score(y_test, y_pred_test)
-            }
-        }
+        metrics = split_metrics(y_train, y_pred_train, y_test, y_pred_test)
         
-        return {
+        resultado = {
             'model': model,
             'predictions': {
                 'train': y_pred_train,
@@ -84,34 +239,122 @@ class PredictiveModels:
             },
             'metrics': metrics
         }
+        
+        # Banda empírica con los residuos de entrenamiento (pocos parámetros)
+        residuos = y_train - y_pred_train
+        return add_intervals(resultado, conformal_quantiles(residuos, MODEL_CONFIG['interval_alpha']))
     
+    def _forest_jobs(self):
+        """Núcleos para Random Forest: uno solo si ya corre dentro de un pool"""
+        if multiprocessing.parent_process() is not None:
+            return 1
+        return MODEL_CONFIG['rf_n_jobs']
+        
     def train_random_forest(self, serie, lookback=12):
-        """Entrena modelo de Random Forest"""
+        """
+        Entrena modelo de Random Forest
+        
+        El bosque se construye en todos los núcleos y crece con warm_start
+        de a `paso` árboles; se detiene al llegar a n_estimators o cuando el
+        R² out-of-bag deja de mejorar.
+        """
         X_train, X_test, y_train, y_test, dates = self.prepare_data(serie, lookback)
+        model = self._fit_forest(X_train, y_train)
+        return self._forest_result(model, X_train, X_test, y_train, y_test, dates)
         
-        # Entrenar modelo
-        model = RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10)
+    def fit_lag_model(self, model_name, X_train, y_train):
+        """
+        Ajusta un modelo de rezagos (Regresión Lineal o Random Forest) sobre
+        una matriz ya construida
+        """
+        if model_name == 'Linear Regression':
+            return LinearRegression().fit(X_train, y_train)
+        if model_name == 'Random Forest':
+            return self._fit_forest(X_train, y_train)
+        raise ValueError(f"No es un modelo de rezagos: {model_name}")
+        
+    def _fit_forest(self, X_train, y_train):
+        """Entrena un bosque creciente hasta la meseta del R² out-of-bag"""
+        params = HIPERPARAMETROS['Random Forest']
+        model = RandomForestRegressor(
+            n_estimators=min(params['paso'], params['n_estimators']),
+            random_state=self.random_state,
+            max_depth=params['max_depth'],
+            n_jobs=self._forest_jobs(),
+            warm_start=True,
+            oob_score=True
+        )
         model.fit(X_train, y_train)
         
+        while model.n_estimators < params['n_estimators']:
+            oob_previo = model.oob_score_
+            model.n_estimators = min(model.n_estimators + params['paso'], params['n_estimators'])
+            model.fit(X_train, y_train)
+            if model.oob_score_ - oob_previo < params['tolerancia_oob']:
+                break
+                
+        return model
+        
+    def update_random_forest(self, resultado, serie, lookback=12):
+        """
+        Actualiza un Random Forest ya entrenado con las observaciones nuevas
+        
+        Los árboles existentes se conservan y se agregan `paso` árboles
+        (warm_start) entrenados sobre todos los datos. Se entrena desde cero
+        si la historia cambió o si se acumularon MODEL_CONFIG['rf_refit_every']
+        meses sin reentrenar.
+        
+        Args:
+            resultado: Resultado previo de train_random_forest o update_random_forest
+            serie: Serie temporal con los datos nuevos al final
+            lookback: Número de períodos anteriores a usar como features
+        """
+        serie = serie.dropna()
+        if resultado is None or not self._extends(resultado['predictions'], serie, lookback):
+            return self.train_random_forest(serie, lookback)
+            
+        X_train, X_test, y_train, y_test, dates = self.prepare_data(serie, lookback)
+        nuevos = len(y_train) - len(resultado['predictions']['y_train'])
+        sin_reajuste = resultado.get('sin_reajuste', 0) + max(nuevos, 0)
+        if sin_reajuste >= MODEL_CONFIG['rf_refit_every']:
+            return self.train_random_forest(serie, lookback)
+            
+        model = resultado['model']
+        if nuevos > 0:
+            # Sobre una copia, para no alterar el resultado previo; el OOB de
+            # los árboles viejos ya no es válido con más filas
+            model = copy.deepcopy(model)
+            model.set_params(
+                n_estimators=len(model.estimators_) + HIPERPARAMETROS['Random Forest']['paso'],
+                n_jobs=self._forest_jobs(),
+                warm_start=True,
+                oob_score=False
+            )
+            model.fit(X_train, y_train)
+            
+        # Los residuos out-of-bag ya no están disponibles: se conserva el
+        # cuantil del intervalo del bosque anterior
+        return self._forest_result(
+            model, X_train, X_test, y_train, y_test, dates, sin_reajuste, resultado.get('cuantil')
+        )
+        
+    def _forest_result(self, model, X_train, X_test, y_train, y_test, dates, sin_reajuste=0,
+                       cuantil=None):
+        """
+        Arma el resultado de un Random Forest entrenado
+        
+        La banda de predicción se calibra con los residuos out-of-bag (los
+        de entrenamiento subestiman el error de un bosque), salvo que se
+        indique el cuantil.
+        """
         # Predicciones
         y_pred_train = model.predict(X_train)
         y_pred_test = model.predict(X_test)
         
         # Métricas
-        metrics = {
-            'train': {
-                'mse': mean_squared_error(y_train, y_pred_train),
-                'mae': mean_absolute_error(y_train, y_pred_train),
-                'r2': r2_score(y_train, y_pred_train)
-            },
-            'test': {
-                'mse': mean_squared_error(y_test, y_pred_test),
-                'mae': mean_absolute_error(y_test, y_pred_test),
-                'r2': r2_score(y_test, y_pred_test)
-            }
-        }
+        metrics = split_metrics(y_train, y_pred_train, y_test, y_pred_test)
         
-        return {
+        resultado = {
             'model': model,
             'predictions': {
                 'train': y_pred_train,
@@ -120,118 +363,555 @@ class PredictiveModels:
                 'y_test': y_test,
                 'dates': dates
             },
-            'metrics': metrics
+            'metrics': metrics,
+            'sin_reajuste': sin_reajuste
         }
+        
+        if cuantil is None:
+            oob = getattr(model, 'oob_prediction_', None)
+            if model.oob_score and oob is not None and len(oob) == len(y_train):
+                residuos = y_train - oob
+            else:
+                residuos = y_train - y_pred_train
+            cuantil = conformal_quantiles(residuos, MODEL_CONFIG['interval_alpha'])
+        return add_intervals(resultado, cuantil)
+        
+    def _extends(self, predicciones, serie, desplazamiento=0):
+        """
+        Indica si una serie conserva intacta la historia de un resultado previo
+        
+        Args:
+            predicciones: Predicciones del resultado previo
+            serie: Serie temporal actual, sin nulos
+            desplazamiento: Períodos iniciales de la serie sin predicción (lookback)
+        """
+        fechas = predicciones['dates']
+        n = len(fechas)
+        valores = np.concatenate([predicciones['y_train'], predicciones['y_test']])
+        actual = serie.iloc[desplazamiento:desplazamiento + n]
+        return (len(actual) == n
+                and actual.index.equals(fechas)
+                and np.allclose(actual.values, valores))
     
-    def train_sarima(self, serie):
-        """Entrena modelo SARIMA"""
+    def train_sarima(self, serie, split_idx=None):
+        """
+        Entrena modelo SARIMA
+        
+        Args:
+            serie: Serie temporal
+            split_idx: Valores de entrenamiento (por defecto, según test_size)
+        """
         serie = serie.dropna()
         
-        # Normalizar serie
+        # Normalizar serie (un escalador por ajuste: se guarda con el modelo
+        # para poder actualizarlo con observaciones nuevas)
+        self.scaler = MinMaxScaler()
         serie_norm = self.scaler.fit_transform(serie.values.reshape(-1, 1)).flatten() * 10
         serie_norm = pd.Series(serie_norm, index=serie.index)
         
         # Split train/test
-        split_idx = int(len(serie_norm) * (1 - self.test_size))
+        if split_idx is None:
+            split_idx = int(len(serie_norm) * (1 - self.test_size))
         train = serie_norm.iloc[:split_idx]
         test = serie_norm.iloc[split_idx:]
         
         try:
-            # Entrenar modelo SARIMA
-            model = SARIMAX(
-                train,
-                order=(1, 1, 1),
-                seasonal_order=(1, 1, 1, 12),
-                enforce_stationarity=False,
-                enforce_invertibility=False
-            )
-            fitted_model = model.fit(disp=False, maxiter=200)
-            
-            # Predicciones
-            y_pred_train = fitted_model.fittedvalues
-            y_pred_test = fitted_model.forecast(steps=len(test))
-            
-            # Desnormalizar
-            y_pred_train_original = self.scaler.inverse_transform(
-                (y_pred_train / 10).values.reshape(-1, 1)
-            ).flatten()
-            y_pred_test_original = self.scaler.inverse_transform(
-                (y_pred_test.values / 10).reshape(-1, 1)
-            ).flatten()
-            
-            train_original = serie.iloc[:split_idx].values
-            test_original = serie.iloc[split_idx:].values
-            
-            # Métricas
-            metrics = {
-                'train': {
-                    'mse': mean_squared_error(train_original, y_pred_train_original),
-                    'mae': mean_absolute_error(train_original, y_pred_train_original),
-                    'r2': r2_score(train_original, y_pred_train_original)
-                },
-                'test': {
-                    'mse': mean_squared_error(test_original, y_pred_test_original),
-                    'mae': mean_absolute_error(test_original, y_pred_test_original),
-                    'r2': r2_score(test_original, y_pred_test_original)
-                }
-            }
+            # Entrenar modelo SARIMA con los órdenes elegidos sobre el tramo de entrenamiento
+            fitted_model = self.fit_sarima(train)
             
-            return {
-                'model': fitted_model,
-                'predictions': {
-                    'train': y_pred_train_original,
-                    'test': y_pred_test_original,
-                    'y_train': train_original,
-                    'y_test': test_original,
-                    'dates': serie.index
-                },
-                'metrics': metrics
-            }
+            return self._sarima_result(fitted_model, serie, split_idx, self.scaler)
         
         except Exception as e:
-            print(f"Error en SARIMA: {e}")
+            # La excepción queda en errors; train_job la propaga al estado del trabajo
+            self.errors['SARIMA'] = e
             return None
+            
+    def fit_sarima(self, train):
+        """
+        Ajusta SARIMA sobre el tramo de entrenamiento
+        
+        Con la búsqueda habilitada, el de menor AIC/BIC en la grilla de
+        SARIMA_SEARCH_CONFIG, reutilizando el ajuste de la búsqueda; si está
+        deshabilitada o ningún candidato converge, los órdenes fijos de
+        MODEL_CONFIG.
+        """
+        if self.order_search is not None:
+            fitted_model = self.order_search.fit(train)
+            if fitted_model is not None:
+                return fitted_model
+        model = SARIMAX(
+            train,
+            order=HIPERPARAMETROS['SARIMA']['order'],
+            seasonal_order=HIPERPARAMETROS['SARIMA']['seasonal_order'],
+            enforce_stationarity=False,
+            enforce_invertibility=False
+        )
+        return model.fit(disp=False, maxiter=200)
+            
+    def _sarima_result(self, fitted_model, serie, split_idx, scaler, sin_reajuste=0):
+        """
+        Arma el resultado de un SARIMA ajustado sobre la serie normalizada
+        
+        La banda de predicción se calibra con los errores de un paso del
+        tramo de entrenamiento (sin el arranque de la diferenciación) y, en
+        la prueba, se ensancha según el error estándar del pronóstico a h
+        pasos relativo al de un paso.
+        
+        Args:
+            fitted_model: Resultados de SARIMAX sobre los primeros split_idx valores
+            serie: Serie original, sin nulos
+            split_idx: Largo del tramo de entrenamiento
+            scaler: Escalador con el que se normalizó la serie
+            sin_reajuste: Observaciones agregadas desde la última estimación completa
+        """
+        # Predicciones
+        y_pred_train = fitted_model.fittedvalues
+        pronostico = fitted_model.get_forecast(steps=len(serie) - split_idx)
+        y_pred_test = pronostico.predicted_mean
+        
+        # Desnormalizar
+        y_pred_train_original = scaler.inverse_transform(
+            (y_pred_train / 10).values.reshape(-1, 1)
+        ).flatten()
+        y_pred_test_original = scaler.inverse_transform(
+            (y_pred_test.values / 10).reshape(-1, 1)
+        ).flatten()
+        
+        train_original = serie.iloc[:split_idx].values
+        test_original = serie.iloc[split_idx:].values
+        
+        # Métricas
+        metrics = split_metrics(
+            train_original, y_pred_train_original, test_original, y_pred_test_original
+        )
+        
+        resultado = {
+            'model': fitted_model,
+            'scaler': scaler,
+            'sin_reajuste': sin_reajuste,
+            'predictions': {
+                'train': y_pred_train_original,
+                'test': y_pred_test_original,
+                'y_train': train_original,
+                'y_test': test_original,
+                'dates': serie.index
+            },
+            'metrics': metrics
+        }
+        
+        order = fitted_model.model.order
+        seasonal_order = fitted_model.model.seasonal_order
+        arranque = order[1] + seasonal_order[1] * seasonal_order[3]
+        residuos = (train_original - y_pred_train_original)[arranque:]
+        error_estandar = np.asarray(pronostico.se_mean)
+        escala = error_estandar / error_estandar[0] if len(error_estandar) else None
+        return add_intervals(
+            resultado, conformal_quantiles(residuos, MODEL_CONFIG['interval_alpha']), escala
+        )
+        
+    def update_sarima(self, resultado, serie):
+        """
+        Actualiza un SARIMA ya ajustado con las observaciones nuevas de la serie
+        
+        Con los parámetros ya estimados, solo se corre el filtro de Kalman
+        sobre los meses nuevos (append sin reestimar). Se reestima desde cero
+        si la historia cambió, si se acumularon MODEL_CONFIG['sarima_refit_every']
+        meses sin reajuste o si el error en los meses nuevos delata deriva.
+        
+        Args:
+            resultado: Resultado previo de train_sarima o update_sarima
+            serie: Serie temporal con los datos nuevos al final
+        """
+        serie = serie.dropna()
+        if resultado is None or 'scaler' not in resultado:
+            return self.train_sarima(serie)
+            
+        # La historia previa debe seguir igual (sin revisiones)
+        if not self._extends(resultado['predictions'], serie):
+            return self.train_sarima(serie)
+            
+        n_train = len(resultado['predictions']['y_train'])
+        split_idx = int(len(serie) * (1 - self.test_size))
+        nuevos = split_idx - n_train
+        sin_reajuste = resultado['sin_reajuste'] + max(nuevos, 0)
+        if sin_reajuste >= MODEL_CONFIG['sarima_refit_every']:
+            return self.train_sarima(serie)
+            
+        scaler = resultado['scaler']
+        serie_norm = pd.Series(
+            scaler.transform(serie.values.reshape(-1, 1)).flatten() * 10, index=serie.index
+        )
+        
+        fitted_model = resultado['model']
+        if nuevos > 0:
+            try:
+                fitted_model = fitted_model.append(serie_norm.iloc[n_train:split_idx], refit=False)
+            except Exception:
+                # No se pudo filtrar con los parámetros previos: se reestima
+                return self.train_sarima(serie)
+                
+            # Deriva: error de un paso en los meses nuevos frente al histórico,
+            # sin el tramo inicial de diferenciación
+            order = fitted_model.model.order
+            seasonal_order = fitted_model.model.seasonal_order
+            arranque = order[1] + seasonal_order[1] * seasonal_order[3]
+            residuos = np.abs(fitted_model.resid.values)
+            escala = residuos[arranque:n_train].mean()
+            if residuos[n_train:].mean() > MODEL_CONFIG['sarima_drift_threshold'] * escala:
+                return self.train_sarima(serie)
+                
+        return self._sarima_result(fitted_model, serie, split_idx, scaler, sin_reajuste)
+        
+    def update_model(self, resultado, serie, model_name):
+        """
+        Actualiza un modelo previo con los datos nuevos de la serie
+        
+        Los modelos que no están en ACTUALIZABLES se entrenan desde cero.
+        """
+        if model_name not in ACTUALIZABLES:
+            return self.train_model(serie, model_name)
+        metodo = getattr(self, ACTUALIZABLES[model_name])
+        if 'lookback' in HIPERPARAMETROS[model_name]:
+            return metodo(resultado, serie, HIPERPARAMETROS[model_name]['lookback'])
+        return metodo(resultado, serie)
     
+    def train_baseline(self, serie, model_name, split_idx=None):
+        """
+        Calcula un modelo de referencia (Seasonal Naive, Drift o Holt-Winters)
+        
+        Usa la misma división train/test que SARIMA.
+        """
+        lote = baselines_batch({'serie': serie}, self.test_size, split_idx=split_idx)
+        return lote['serie'][model_name]
+        
+    def train_model(self, serie, model_name, split_idx=None):
+        """
+        Entrena un modelo por nombre
+        
+        Args:
+            serie: Serie temporal
+            model_name: Nombre del modelo (ver MODELOS)
+            split_idx: Valores de entrenamiento de la serie (por defecto,
+                según test_size); solo SARIMA y los modelos de referencia
+        """
+        if model_name not in MODELOS:
+            raise ValueError(f"Modelo no soportado: {model_name}")
+        if model_name in BASELINES:
+            return self.train_baseline(serie, model_name, split_idx)
+        metodo = getattr(self, MODELOS[model_name])
+        if 'lookback' in HIPERPARAMETROS[model_name]:
+            if split_idx is not None:
+                raise ValueError(f"split_idx no está soportado para {model_name}")
+            return metodo(serie, HIPERPARAMETROS[model_name]['lookback'])
+        return metodo(serie, split_idx)
+        
+    def get_hyperparameters(self, model_name):
+        """Retorna los hiperparámetros con los que se entrena un modelo"""
+        return {
+            **HIPERPARAMETROS[model_name],
+            'test_size': self.test_size,
+            'random_state': self.random_state
+        }
+        
     def compare_models(self, serie, nombre_serie):
         """
-        Compara los tres modelos en una serie
+        Compara los modelos en una serie, incluidos los de referencia
         
         Returns:
             DataFrame con métricas comparativas
         """
-        print(f"Entrenando modelos para: {nombre_serie}")
+        # Entrenar modelos; los de referencia salen todos de un mismo lote
+        resultados = {
+            model_name: self.train_model(serie, model_name)
+            for model_name in MODELOS if model_name not in BASELINES
+        }
+        resultados.update(baselines_batch({nombre_serie: serie}, self.test_size)[nombre_serie])
+        return self.add_results(nombre_serie, resultados)
         
-        # Entrenar modelos
-        lr_result = self.train_linear_regression(serie)
-        rf_result = self.train_random_forest(serie)
-        sarima_result = self.train_sarima(serie)
+    def add_results(self, nombre_serie, resultados):
+        """
+        Registra resultados de entrenamiento (por ejemplo, de otro proceso)
         
+        Args:
+            nombre_serie: Nombre de la serie
+            resultados: Diccionario {modelo: resultado}
+            
+        Returns:
+            DataFrame con métricas comparativas
+        """
         # Guardar resultados
-        self.models[nombre_serie] = {
-            'Linear Regression': lr_result,
-            'Random Forest': rf_result,
-            'SARIMA': sarima_result
-        }
+        self.models[nombre_serie] = resultados
         
         # Crear tabla comparativa
-        comparacion = []
-        
-        for model_name, result in self.models[nombre_serie].items():
-            if result is not None:
-                comparacion.append({
-                    'Modelo': model_name,
-                    'MAE (Train)': result['metrics']['train']['mae'],
-                    'MSE (Train)': result['metrics']['train']['mse'],
-                    'R² (Train)': result['metrics']['train']['r2'],
-                    'MAE (Test)': result['metrics']['test']['mae'],
-                    'MSE (Test)': result['metrics']['test']['mse'],
-                    'R² (Test)': result['metrics']['test']['r2']
-                })
-        
-        df_comparacion = pd.DataFrame(comparacion)
-        
-        return df_comparacion
+        return metrics_table({
+            model_name: result['metrics'] if result is not None else None
+            for model_name, result in resultados.items()
+        })
     
+    def train_global(self, series, model_name='Random Forest'):
+        """
+        Entrena un único modelo sobre todas las series
+        
+        Apila las ventanas de rezagos de todas las series (estandarizadas,
+        con identidad de la serie y mes como features) y ajusta un solo
+        modelo; el costo depende del total de filas y no de la cantidad de
+        series.
+        
+        Args:
+            series: Diccionario {nombre de la serie: Serie temporal}
+            model_name: 'Linear Regression' o 'Random Forest'
+            
+        Returns:
+            Diccionario {serie: resultado}, con la misma forma que train_model;
+            todas las series comparten el mismo 'model'
+        """
+        if model_name not in ('Linear Regression', 'Random Forest'):
+            raise ValueError(f"Modelo global no soportado: {model_name}")
+            
+        datos, model = self._fit_global(series, model_name)
+        prediccion = model.predict(datos.X)
+        reales = datos.split(datos.unscale(datos.y))
+        predichos = datos.split(datos.unscale(prediccion))
+        
+        # Calibración de los intervalos: out-of-bag en el bosque, de
+        # entrenamiento en la regresión lineal
+        calibracion = prediccion.copy()
+        if model_name == 'Random Forest':
+            calibracion[datos.train_mask] = model.oob_prediction_
+        calibrados = datos.split(datos.unscale(calibracion))
+        
+        resultados = {}
+        for nombre, dates in zip(datos.nombres, datos.dates):
+            y_train, y_test = reales[nombre]
+            y_pred_train, y_pred_test = predichos[nombre]
+            cuantil = conformal_quantiles(y_train - calibrados[nombre][0], MODEL_CONFIG['interval_alpha'])
+            resultados[nombre] = add_intervals({
+                'model': model,
+                'predictions': {
+                    'train': y_pred_train,
+                    'test': y_pred_test,
+                    'y_train': y_train,
+                    'y_test': y_test,
+                    'dates': dates
+                },
+                'metrics': split_metrics(y_train, y_pred_train, y_test, y_pred_test)
+            }, cuantil)
+            
+        return resultados
+        
+    def _fit_global(self, series, model_name):
+        """Retorna el GlobalDataset de las series y el modelo global ajustado"""
+        if model_name not in ('Linear Regression', 'Random Forest'):
+            raise ValueError(f"Modelo global no soportado: {model_name}")
+            
+        datos = GlobalDataset(series, HIPERPARAMETROS[model_name]['lookback'], self.test_size)
+        model = self.fit_lag_model(model_name, datos.X[datos.train_mask], datos.y[datos.train_mask])
+        return datos, model
+        
+    def compare_global(self, series, model_name='Random Forest'):
+        """
+        Entrena el modelo global y desglosa sus métricas por serie
+        
+        Returns:
+            DataFrame con las columnas de compare_models más 'Serie'; el
+            modelo figura como '<modelo> (global)'
+        """
+        resultados = self.train_global(series, model_name)
+        tablas = []
+        for nombre, resultado in resultados.items():
+            tabla = metrics_table({f'{model_name} (global)': resultado['metrics']})
+            tabla.insert(0, 'Serie', nombre)
+            tablas.append(tabla)
+        return pd.concat(tablas, ignore_index=True)
+        
+    def forecast(self, series, model_name, horizon=12, global_model=False):
+        """
+        Pronostica los próximos `horizon` meses de una o varias series
+        
+        Los pronósticos parten del último dato observado y usan toda la
+        serie: Regresión Lineal y Random Forest se reajustan sobre todas las
+        ventanas (entrenamiento y prueba, ver _fit_full) y pronostican en
+        forma recursiva, alimentando cada predicción como rezago del paso
+        siguiente; SARIMA incorpora el tramo de prueba a su estado (sin
+        reestimar) y usa su forecast. El resultado se memoiza por contenido
+        de las series.
+        
+        Args:
+            series: Serie temporal, o diccionario {nombre: Serie temporal}
+            model_name: 'Linear Regression', 'Random Forest' o 'SARIMA'
+            horizon: Meses a pronosticar
+            global_model: Usar un único modelo para todas las series
+                (ver train_global; solo Regresión Lineal y Random Forest)
+                
+        Returns:
+            Serie con el pronóstico indexada por fecha, o un diccionario
+            {nombre: Serie} si se pasó un diccionario. Las series demasiado
+            cortas para entrenar el modelo (o que no pudo ajustarse) quedan
+            como None
+        """
+        if isinstance(series, pd.Series):
+            return self.forecast({series.name: series}, model_name, horizon, global_model)[series.name]
+        if model_name not in ('Linear Regression', 'Random Forest', 'SARIMA'):
+            raise ValueError(f"Pronóstico no disponible para: {model_name}")
+            
+        series = {nombre: serie.dropna() for nombre, serie in series.items()}
+        clave = (
+            tuple((nombre, series_key(serie)) for nombre, serie in series.items()),
+            model_name, horizon, global_model, self.test_size
+        )
+        if clave in self._forecasts:
+            self._forecasts.move_to_end(clave)
+            return self._forecasts[clave]
+            
+        entrenables = {
+            nombre: serie for nombre, serie in series.items() if self._trainable(serie, model_name)
+        }
+        if model_name == 'SARIMA':
+            pronosticos = {
+                nombre: self._forecast_sarima(serie, horizon) for nombre, serie in entrenables.items()
+            }
+        elif entrenables:
+            pronosticos = self._forecast_lags(entrenables, model_name, horizon, global_model)
+        else:
+            pronosticos = {}
+            
+        resultado = {nombre: pronosticos.get(nombre) for nombre in series}
+        self._remember(self._forecasts, clave, resultado)
+        return resultado
+        
+    @staticmethod
+    def _remember(memo, clave, valor):
+        """Guarda un valor en una memo acotada a MEMO_MAX entradas"""
+        memo[clave] = valor
+        while len(memo) > MEMO_MAX:
+            memo.popitem(last=False)
+        
+    def _trainable(self, serie, model_name):
+        """
+        Indica si una serie (sin nulos) alcanza para entrenar un modelo
+        
+        Los modelos de rezagos necesitan al menos dos ventanas de
+        entrenamiento; SARIMA, una temporada completa más un valor en el
+        tramo de entrenamiento.
+        """
+        if 'lookback' in HIPERPARAMETROS[model_name]:
+            ventanas = len(serie) - HIPERPARAMETROS[model_name]['lookback']
+            return int(ventanas * (1 - self.test_size)) >= 2
+        return int(len(serie) * (1 - self.test_size)) > PERIODO
+        
+    def _forecast_lags(self, series, model_name, horizon, global_model):
+        """Pronóstico recursivo de todas las series a la vez"""
+        nombres = list(series)
+        lookback = HIPERPARAMETROS[model_name]['lookback']
+        fechas = {nombre: future_dates(series[nombre].index, horizon) for nombre in nombres}
+        
+        # Última ventana observada de cada serie (series, lookback)
+        ventanas = np.stack([
+            series[nombre].to_numpy(dtype=np.float64)[-lookback:] for nombre in nombres
+        ])
+        
+        if global_model:
+            datos, model = self._fit_full_global(series, model_name)
+            
+            def paso(ventanas, h):
+                objetivo = pd.DatetimeIndex([fechas[nombre][h] for nombre in nombres])
+                pred = model.predict(datos.features(ventanas, objetivo))
+                return pred * datos.desviaciones + datos.medias
+                
+        elif model_name == 'Linear Regression':
+            ajustes = self._fit_full(series, model_name)
+            coeficientes = np.stack([ajustes[nombre][0] for nombre in nombres])
+            interceptos = np.array([ajustes[nombre][1] for nombre in nombres])
+            
+            def paso(ventanas, h):
+                return np.einsum('bl,bl->b', ventanas, coeficientes) + interceptos
+                
+        else:
+            # Un bosque por serie, aplanados: cada paso recorre todos los
+            # árboles de todas las series en una sola pasada
+            ajustes = self._fit_full(series, model_name)
+            bosques = ForestBatch([ajustes[nombre] for nombre in nombres])
+                
+            def paso(ventanas, h):
+                return bosques.predict(ventanas)
+                
+        pronostico = np.empty((len(nombres), horizon))
+        for h in range(horizon):
+            pronostico[:, h] = paso(ventanas, h)
+            ventanas = np.concatenate([ventanas[:, 1:], pronostico[:, h:h + 1]], axis=1)
+            
+        return {
+            nombre: pd.Series(pronostico[b], index=fechas[nombre], name=nombre)
+            for b, nombre in enumerate(nombres)
+        }
+        
+    def _fit_full(self, series, model_name):
+        """
+        Ajusta un modelo de rezagos por serie sobre todas sus ventanas
+        
+        Es el ajuste que se usa para pronosticar, distinto del que se evalúa
+        (solo el tramo de entrenamiento); se memoiza aparte, por contenido
+        de cada serie.
+        
+        Returns:
+            Diccionario {nombre: ajuste}: (coeficientes, intercepto) en
+            Regresión Lineal y el bosque en Random Forest
+        """
+        lookback = HIPERPARAMETROS[model_name]['lookback']
+        claves = {nombre: (series_key(serie), model_name) for nombre, serie in series.items()}
+        ajustes = {}
+        for nombre, clave in claves.items():
+            if clave in self._full_fits:
+                self._full_fits.move_to_end(clave)
+                ajustes[nombre] = self._full_fits[clave]
+        faltantes = [nombre for nombre in series if nombre not in ajustes]
+        
+        if faltantes and model_name == 'Linear Regression':
+            # Todas las filas de cada serie cuentan como entrenamiento
+            lote = LagBatch({nombre: series[nombre] for nombre in faltantes}, lookback, test_size=0.0)
+            coef, intercepto = fit_linear_batch(lote.X, lote.y, lote.train_mask)
+            nuevos = {nombre: (coef[b], intercepto[b]) for b, nombre in enumerate(lote.nombres)}
+        else:
+            nuevos = {
+                nombre: self._fit_forest(*lag_matrix(series[nombre].to_numpy(dtype=np.float64), lookback))
+                for nombre in faltantes
+            }
+        for nombre, ajuste in nuevos.items():
+            self._remember(self._full_fits, claves[nombre], ajuste)
+        ajustes.update(nuevos)
+        return ajustes
+        
+    def _fit_full_global(self, series, model_name):
+        """Retorna el GlobalDataset y el modelo global ajustados sobre las series completas"""
+        clave = (tuple((nombre, series_key(serie)) for nombre, serie in series.items()), model_name)
+        if clave in self._full_fits:
+            self._full_fits.move_to_end(clave)
+            return self._full_fits[clave]
+            
+        datos = GlobalDataset(series, HIPERPARAMETROS[model_name]['lookback'], test_size=0.0)
+        ajuste = (datos, self.fit_lag_model(model_name, datos.X, datos.y))
+        self._remember(self._full_fits, clave, ajuste)
+        return ajuste
+        
+    def _forecast_sarima(self, serie, horizon):
+        """Pronóstico de SARIMA desde el último dato observado"""
+        resultado = self.train_sarima(serie)
+        if resultado is None:
+            return None
+            
+        scaler = resultado['scaler']
+        fitted_model = resultado['model']
+        n_train = len(resultado['predictions']['y_train'])
+        if n_train < len(serie):
+            serie_norm = pd.Series(
+                scaler.transform(serie.values.reshape(-1, 1)).flatten() * 10, index=serie.index
+            )
+            fitted_model = fitted_model.append(serie_norm.iloc[n_train:], refit=False)
+            
+        pronostico = fitted_model.forecast(steps=horizon)
+        valores = scaler.inverse_transform((np.asarray(pronostico) / 10).reshape(-1, 1)).flatten()
+        return pd.Series(valores, index=future_dates(serie.index, horizon), name=serie.name)
+        
     def get_predictions(self, serie_nombre, modelo_nombre):
         """Obtiene las predicciones de un modelo específico"""
         if serie_nombre in self.models and modelo_nombre in self.models[serie_nombre]:
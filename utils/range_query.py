@@ -0,0 +1,60 @@
+"""
+Consultas por rango de fechas con búsqueda binaria y sumas prefijo
+"""
+import numpy as np
+import pandas as pd
+
+class SeriesRangeIndex:
+    """
+    Índice de rangos de fechas sobre una serie con índice ordenado
+    
+    Los límites de un rango se ubican con búsqueda binaria sobre el
+    DatetimeIndex y las sumas prefijo permiten obtener totales y promedios
+    de cualquier rango en O(log n), sin recorrer los valores.
+    """
+    
+    def __init__(self, serie):
+        """
+        Args:
+            serie: Serie indexada por fecha, en orden creciente
+        """
+        if not serie.index.is_monotonic_increasing:
+            raise ValueError("La serie debe tener un índice de fechas ordenado")
+            
+        self.serie = serie
+        valores = serie.to_numpy(dtype=np.float64)
+        presentes = ~np.isnan(valores)
+        
+        # suma[k] y conteo[k] acumulan los primeros k valores (sin NaN)
+        self._suma = np.concatenate([[0.0], np.cumsum(np.where(presentes, valores, 0.0))])
+        self._conteo = np.concatenate([[0], np.cumsum(presentes)])
+        
+    def bounds(self, inicio=None, fin=None):
+        """
+        Retorna las posiciones [i, j) de las fechas entre inicio y fin (inclusive)
+        """
+        index = self.serie.index
+        i = 0 if inicio is None else index.searchsorted(pd.Timestamp(inicio), side='left')
+        j = len(index) if fin is None else index.searchsorted(pd.Timestamp(fin), side='right')
+        return i, max(i, j)
+        
+    def slice(self, inicio=None, fin=None):
+        """Retorna la porción de la serie en el rango (vista, sin copia)"""
+        i, j = self.bounds(inicio, fin)
+        return self.serie.iloc[i:j]
+        
+    def total(self, inicio=None, fin=None):
+        """Suma de los valores en el rango"""
+        i, j = self.bounds(inicio, fin)
+        return float(self._suma[j] - self._suma[i])
+        
+    def count(self, inicio=None, fin=None):
+        """Número de valores no nulos en el rango"""
+        i, j = self.bounds(inicio, fin)
+        return int(self._conteo[j] - self._conteo[i])
+        
+    def mean(self, inicio=None, fin=None):
+        """Promedio de los valores en el rango (NaN si está vacío)"""
+        i, j = self.bounds(inicio, fin)
+        n = self._conteo[j] - self._conteo[i]
+        return float((self._suma[j] - self._suma[i]) / n) if n else np.nan
@@ -0,0 +1,188 @@
+"""
+Backend de almacenamiento de series en una base de datos embebida (SQLite)
+"""
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Expresiones SQL de cada nivel de agregación: (columna, expresión)
+NIVELES_SQL = {
+    'anual': [('Año', "CAST(strftime('%Y', fecha) AS INTEGER)")],
+    'trimestral': [
+        ('Año', "CAST(strftime('%Y', fecha) AS INTEGER)"),
+        ('Trimestre', "(CAST(strftime('%m', fecha) AS INTEGER) - 1) / 3 + 1"),
+    ],
+    'mensual': [('Mes', "CAST(strftime('%m', fecha) AS INTEGER)")],
+    'anio_mes': [
+        ('Año', "CAST(strftime('%Y', fecha) AS INTEGER)"),
+        ('Mes', "CAST(strftime('%m', fecha) AS INTEGER)"),
+    ],
+}
+
+ESTADISTICAS_SQL = {
+    'sum': 'SUM(valor)',
+    'mean': 'AVG(valor)',
+    'min': 'MIN(valor)',
+    'max': 'MAX(valor)',
+    'count': 'COUNT(valor)',
+}
+
+def iter_frame_series(frames):
+    """
+    Recorre las series de varios dataframes sin copiarlos
+    
+    Args:
+        frames: Diccionario {flujo: DataFrame (fecha x producto)}
+        
+    Yields:
+        Tuplas (flujo, producto, fechas datetime64, valores)
+    """
+    for flujo, df in frames.items():
+        fechas = df.index.values
+        for producto in df.columns:
+            yield flujo, producto, fechas, df[producto].to_numpy()
+
+class SQLiteBackend:
+    """
+    Series normalizadas (flujo, producto, fecha, valor) en SQLite
+    
+    La clave primaria (flujo, producto, fecha) sirve de índice para los
+    filtros por serie y rango de fechas; las agregaciones se resuelven en
+    SQL y solo el resultado llega a pandas.
+    """
+    
+    def __init__(self, db_path):
+        """
+        Args:
+            db_path: Ruta del archivo de la base de datos
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS series ("
+                " flujo TEXT NOT NULL, producto TEXT NOT NULL, fecha TEXT NOT NULL,"
+                " valor REAL NOT NULL, PRIMARY KEY (flujo, producto, fecha)"
+                ") WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT)"
+            )
+            
+    def _connect(self):
+        # Una conexión por operación: el backend se puede usar desde los
+        # hilos de Streamlit sin compartir conexiones
+        return sqlite3.connect(self.db_path)
+        
+    def is_current(self, version):
+        """Indica si la base contiene la versión de datos indicada"""
+        with closing(self._connect()) as conn:
+            fila = conn.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()
+        return fila is not None and fila[0] == version
+        
+    def write(self, frames, version):
+        """
+        Reemplaza el contenido de la base con las series de los dataframes
+        
+        Args:
+            frames: Diccionario {flujo: DataFrame (fecha x producto)}
+            version: Identificador de la versión de los datos
+        """
+        self.write_series(iter_frame_series(frames), version)
+        
+    def write_series(self, series, version):
+        """
+        Reemplaza el contenido de la base con series entregadas una a una
+        
+        Las filas se insertan a medida que se generan, sin armar la tabla
+        larga en memoria.
+        
+        Args:
+            series: Iterable de (flujo, producto, fechas, valores)
+            version: Identificador de la versión de los datos
+        """
+        def filas():
+            for flujo, producto, fechas, valores in series:
+                presentes = ~np.isnan(valores)
+                dias = pd.DatetimeIndex(fechas[presentes]).strftime('%Y-%m-%d')
+                for fecha, valor in zip(dias, valores[presentes]):
+                    yield flujo, str(producto), fecha, float(valor)
+                        
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM series")
+            conn.executemany("INSERT INTO series VALUES (?, ?, ?, ?)", filas())
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,)
+            )
+            
+    def _range_filter(self, inicio, fin):
+        """Condición SQL y parámetros de un rango de fechas (inclusive)"""
+        condicion, params = '', []
+        if inicio is not None:
+            condicion += ' AND fecha >= ?'
+            params.append(pd.Timestamp(inicio).strftime('%Y-%m-%d'))
+        if fin is not None:
+            condicion += ' AND fecha <= ?'
+            params.append(pd.Timestamp(fin).strftime('%Y-%m-%d'))
+        return condicion, params
+        
+    def query(self, flujo, producto, inicio=None, fin=None):
+        """Retorna la serie de un producto entre dos fechas (inclusive)"""
+        condicion, params = self._range_filter(inicio, fin)
+        with closing(self._connect()) as conn:
+            filas = conn.execute(
+                "SELECT fecha, valor FROM series WHERE flujo = ? AND producto = ?"
+                + condicion + " ORDER BY fecha",
+                [flujo, producto] + params
+            ).fetchall()
+            
+        fechas = pd.DatetimeIndex([fila[0] for fila in filas], name='Fecha')
+        return pd.Series([fila[1] for fila in filas], index=fechas, name=producto, dtype=np.float64)
+        
+    def range_stats(self, flujo, producto, inicio=None, fin=None):
+        """Retorna (total, cantidad) de un producto entre dos fechas"""
+        condicion, params = self._range_filter(inicio, fin)
+        with closing(self._connect()) as conn:
+            total, n = conn.execute(
+                "SELECT SUM(valor), COUNT(valor) FROM series WHERE flujo = ? AND producto = ?"
+                + condicion,
+                [flujo, producto] + params
+            ).fetchone()
+        return float(total or 0.0), int(n)
+        
+    def aggregate(self, flujo, nivel, estadistica, productos):
+        """
+        Retorna una agregación (período x producto) calculada en SQL
+        
+        Args:
+            flujo: 'importacion' o 'consumo'
+            nivel: 'anual', 'trimestral', 'mensual' o 'anio_mes'
+            estadistica: 'sum', 'mean', 'min', 'max' o 'count'
+            productos: Productos a incluir
+        """
+        claves = NIVELES_SQL[nivel]
+        columnas = ', '.join(f'{expr} AS "{nombre}"' for nombre, expr in claves)
+        grupos = ', '.join(f'"{nombre}"' for nombre, _ in claves)
+        marcadores = ', '.join('?' for _ in productos)
+        
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(
+                f"SELECT {columnas}, producto, {ESTADISTICAS_SQL[estadistica]} AS valor"
+                f" FROM series WHERE flujo = ? AND producto IN ({marcadores})"
+                f" GROUP BY {grupos}, producto",
+                conn,
+                params=[flujo] + list(productos)
+            )
+            
+        nombres = [nombre for nombre, _ in claves]
+        tabla = df.pivot_table(index=nombres, columns='producto', values='valor', aggfunc='first')
+        tabla = tabla.reindex(columns=list(productos))
+        tabla.columns.name = None
+        if estadistica == 'sum':
+            tabla = tabla.fillna(0.0)
+        elif estadistica == 'count':
+            tabla = tabla.fillna(0).astype('int64')
+        return tabla
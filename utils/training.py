@@ -0,0 +1,213 @@
+"""
+Trabajos de entrenamiento de modelos, con reutilización de artefactos en disco
+"""
+import numpy as np
+from utils.batch_models import BASELINES, baselines_batch, linear_regression_batch
+from utils.features import series_key
+from utils.predictive_models import (ACTUALIZABLES, HIPERPARAMETROS, PredictiveModels,
+                                     compact_result, restore_result)
+
+# Orden de envío al pool: los ajustes más lentos primero, para que el tiempo
+# total quede acotado por el ajuste individual más lento
+ORDEN_ENVIO = ['SARIMA', 'Random Forest', 'Linear Regression'] + BASELINES
+
+# Modelos que se ajustan por lotes sobre todas las series, sin pasar por el pool
+MODELOS_LOTE = ['Linear Regression'] + BASELINES
+
+class TrainingResult:
+    """
+    Resultado compacto de un modelo entrenado
+    
+    Guarda solo las predicciones (float32), las fechas y las métricas; el
+    modelo ajustado queda en el almacén de artefactos y se referencia por su
+    clave. Así el resultado pesa unos pocos KB al cachearse.
+    """
+    
+    __slots__ = ('predictions', 'metrics', 'artifact')
+    
+    def __init__(self, predictions, metrics, artifact=None):
+        """
+        Args:
+            predictions: Diccionario con 'train', 'test', 'y_train', 'y_test' y 'dates'
+            metrics: Métricas de entrenamiento y prueba
+            artifact: Clave del modelo en el ModelArtifactStore (opcional)
+        """
+        self.predictions = predictions
+        self.metrics = metrics
+        self.artifact = artifact
+        
+    @classmethod
+    def from_result(cls, resultado, artifact=None):
+        """Construye el resultado compacto a partir del de PredictiveModels"""
+        predictions = {
+            clave: np.asarray(valores, dtype=np.float32)
+            for clave, valores in resultado['predictions'].items()
+            if clave != 'dates'
+        }
+        predictions['dates'] = resultado['predictions']['dates']
+        return cls(predictions, resultado['metrics'], artifact)
+        
+    def load_model(self, artifacts):
+        """Retorna el modelo ajustado desde el almacén, o None si no está"""
+        if self.artifact is None:
+            return None
+        resultado = restore_result(artifacts.load(self.artifact))
+        return resultado['model'] if resultado is not None else None
+
+def train_job(serie, model_name, test_size, random_state):
+    """
+    Entrena un modelo sobre una serie
+    
+    Es una función de módulo para poder ejecutarse en un pool de procesos;
+    cada trabajo usa la misma semilla, por lo que el resultado no depende
+    del proceso ni del orden en que se ejecute. Si el ajuste falla, se
+    lanza su excepción en lugar de retornar None.
+    """
+    trainer = PredictiveModels(test_size=test_size, random_state=random_state)
+    resultado = trainer.train_model(serie, model_name)
+    if resultado is None:
+        raise_failure(trainer, model_name)
+    return resultado
+
+def raise_failure(trainer, model_name):
+    """
+    Vuelve a lanzar la excepción de un ajuste fallido, si la hay, para que
+    quede en el estado del trabajo (ver BackgroundTrainer.error)
+    """
+    if model_name in trainer.errors:
+        raise trainer.errors[model_name]
+
+def train_batched(series, trabajos, test_size=0.2):
+    """
+    Ajusta de una vez todos los trabajos de modelos por lotes
+    
+    Args:
+        series: Diccionario {nombre de la serie: Serie temporal}
+        trabajos: Lista de (serie, modelo) con modelos de MODELOS_LOTE
+        test_size: Proporción de datos de prueba
+        
+    Returns:
+        Diccionario {(serie, modelo): resultado}
+    """
+    lineales = [nombre for nombre, model_name in trabajos if model_name == 'Linear Regression']
+    referencias = list(dict.fromkeys(
+        nombre for nombre, model_name in trabajos if model_name in BASELINES
+    ))
+    
+    resultados = {}
+    if lineales:
+        lote = linear_regression_batch(
+            {nombre: series[nombre] for nombre in lineales},
+            HIPERPARAMETROS['Linear Regression']['lookback'],
+            test_size
+        )
+        resultados.update({(nombre, 'Linear Regression'): lote[nombre] for nombre in lineales})
+    if referencias:
+        lote = baselines_batch({nombre: series[nombre] for nombre in referencias}, test_size)
+        resultados.update({
+            (nombre, model_name): lote[nombre][model_name]
+            for nombre, model_name in trabajos if model_name in BASELINES
+        })
+    return resultados
+
+def train_batched_results(series, trabajos, test_size=0.2, random_state=42, artifacts=None):
+    """
+    Ajusta los trabajos de modelos por lotes y los guarda en el almacén
+    
+    Es el equivalente de train_one para MODELOS_LOTE: los trabajos que ya
+    están en el almacén se cargan, los demás se ajustan juntos con
+    train_batched y cada resultado se guarda con la misma clave que usaría
+    train_one.
+    
+    Args:
+        series: Diccionario {nombre de la serie: Serie temporal}
+        trabajos: Lista de (serie, modelo) con modelos de MODELOS_LOTE
+        test_size: Proporción de datos de prueba
+        random_state: Semilla de los modelos aleatorios (parte de la clave)
+        artifacts: ModelArtifactStore opcional
+        
+    Returns:
+        Diccionario {(serie, modelo): TrainingResult o None}
+    """
+    if artifacts is None:
+        return {
+            trabajo: TrainingResult.from_result(resultado) if resultado is not None else None
+            for trabajo, resultado in train_batched(series, trabajos, test_size).items()
+        }
+        
+    trainer = PredictiveModels(test_size=test_size, random_state=random_state)
+    nombres = dict.fromkeys(nombre for nombre, _ in trabajos)
+    huellas = {nombre: series_key(series[nombre].dropna()) for nombre in nombres}
+    claves = {
+        (nombre, model_name): artifacts.key(
+            huellas[nombre], model_name, trainer.get_hyperparameters(model_name)
+        )
+        for nombre, model_name in trabajos
+    }
+    
+    ajustes = {}
+    faltantes = []
+    for trabajo in trabajos:
+        resultado = artifacts.load(claves[trabajo])
+        if resultado is not None:
+            ajustes[trabajo] = TrainingResult.from_result(resultado, claves[trabajo])
+        else:
+            faltantes.append(trabajo)
+            
+    for (nombre, model_name), resultado in train_batched(series, faltantes, test_size).items():
+        trabajo = (nombre, model_name)
+        if resultado is None:
+            ajustes[trabajo] = None
+            continue
+        artifacts.save(claves[trabajo], resultado)
+        params = trainer.get_hyperparameters(model_name)
+        artifacts.set_latest(artifacts.alias_key(nombre, model_name, params), claves[trabajo])
+        ajustes[trabajo] = TrainingResult.from_result(resultado, claves[trabajo])
+    return ajustes
+
+def train_one(serie, model_name, test_size=0.2, random_state=42, artifacts=None, nombre=None):
+    """
+    Entrena un único modelo, o lo carga del almacén si ya fue entrenado
+    
+    Si la serie cambió (por ejemplo, llegó un mes nuevo) y el almacén tiene
+    el modelo de la versión anterior de la misma serie (SARIMA o Random
+    Forest), ese modelo se actualiza con las observaciones nuevas en lugar
+    de reestimarse.
+    
+    Args:
+        serie: Serie temporal
+        model_name: Nombre del modelo (ver MODELOS)
+        test_size: Proporción de datos de prueba
+        random_state: Semilla de los modelos aleatorios
+        artifacts: ModelArtifactStore opcional
+        nombre: Nombre de la serie, para ubicar su modelo anterior en el almacén
+        
+    Returns:
+        TrainingResult, o None si la serie es demasiado corta para el modelo;
+        si el ajuste falla, se lanza su excepción
+    """
+    if artifacts is None:
+        resultado = train_job(serie, model_name, test_size, random_state)
+        return TrainingResult.from_result(resultado) if resultado is not None else None
+            
+    trainer = PredictiveModels(test_size=test_size, random_state=random_state)
+    params = trainer.get_hyperparameters(model_name)
+    clave = artifacts.key(series_key(serie.dropna()), model_name, params)
+    resultado = artifacts.load(clave)
+    if resultado is not None:
+        return TrainingResult.from_result(resultado, clave)
+        
+    alias = artifacts.alias_key(nombre, model_name, params) if nombre is not None else None
+    if model_name in ACTUALIZABLES and alias is not None:
+        previo = restore_result(artifacts.load(artifacts.latest(alias)))
+        resultado = trainer.update_model(previo, serie, model_name) if previo is not None else None
+    if resultado is None:
+        resultado = trainer.train_model(serie, model_name)
+    if resultado is None:
+        raise_failure(trainer, model_name)
+        return None
+        
+    artifacts.save(clave, compact_result(resultado))
+    if alias is not None:
+        artifacts.set_latest(alias, clave)
+    return TrainingResult.from_result(resultado, clave)
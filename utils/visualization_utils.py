@@ -6,7 +6,7 @@ import plotly.express as px
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-from config import COLORS
+from config import COLORS, MODEL_CONFIG
 
 def create_time_series_plot(df, columns, title, tipo='importacion'):
     """Crea gráfico de serie temporal interactivo"""
@@ -205,8 +205,41 @@ def create_correlation_heatmap(df):
     
     return fig
 
+def _rgba(color, alpha):
+    """Convierte un color '#rrggbb' a 'rgba(r,g,b,alpha)'"""
+    r, g, b = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+    return f'rgba({r},{g},{b},{alpha})'
+
+def _add_interval_band(fig, x, lower, upper, color, name):
+    """Agrega una banda entre dos curvas (límite superior y luego inferior)"""
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=upper,
+        mode='lines',
+        line=dict(width=0),
+        legendgroup=name,
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=lower,
+        name=name,
+        mode='lines',
+        line=dict(width=0),
+        fill='tonexty',
+        fillcolor=_rgba(color, 0.2),
+        legendgroup=name,
+        hoverinfo='skip'
+    ))
+
 def create_prediction_plot(predictions, serie_nombre, modelo_nombre):
-    """Crea gráfico de predicciones vs valores reales"""
+    """
+    Crea gráfico de predicciones vs valores reales
+    
+    Si las predicciones traen bandas de predicción ('lower_*' y 'upper_*'),
+    se dibujan como bandas alrededor de cada predicción.
+    """
     if predictions is None:
         return None
     
@@ -215,6 +248,18 @@ def create_prediction_plot(predictions, serie_nombre, modelo_nombre):
     
     fig = go.Figure()
     
+    # Bandas de predicción, debajo de las curvas
+    if 'lower_test' in predictions:
+        cobertura = f"{1 - MODEL_CONFIG['interval_alpha']:.0%}"
+        _add_interval_band(
+            fig, dates[:split_idx], predictions['lower_train'], predictions['upper_train'],
+            COLORS['primary'], f'Banda nominal {cobertura} (Train)'
+        )
+        _add_interval_band(
+            fig, dates[split_idx:], predictions['lower_test'], predictions['upper_test'],
+            COLORS['accent'], f'Banda nominal {cobertura} (Test)'
+        )
+    
     # Datos reales - Train
     fig.add_trace(go.Scatter(
         x=dates[:split_idx],